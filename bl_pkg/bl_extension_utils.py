@@ -89,6 +89,11 @@ PKG_EXT = ".zip"
 # Add this to the local JSON file.
 REPO_LOCAL_JSON = os.path.join(REPO_LOCAL_PRIVATE_DIR, PKG_REPO_LIST_FILENAME)
 
+# Manifests of installed packages, validated by the TOML files size & modification time.
+REPO_LOCAL_MANIFEST_CACHE = os.path.join(REPO_LOCAL_PRIVATE_DIR, "bl_ext_manifest_cache.json")
+# Increment when the format of the cache or the manifest validation changes.
+REPO_LOCAL_MANIFEST_CACHE_VERSION = 1
+
 # An item we communicate back to Blender.
 InfoItem = Tuple[str, Any]
 InfoItemSeq = Sequence[InfoItem]
@@ -97,6 +102,10 @@ COMPLETE_ITEM = ('DONE', "")
 
 # Time to wait when there is no output, avoid 0 as it causes high CPU usage.
 IDLE_WAIT_ON_READ = 0.05
+
+# The number of commands a `CommandBatch` runs at once when executing concurrently.
+# Commands are mostly waiting on the network, this limits the number of processes (and connections).
+COMMAND_BATCH_CONCURRENCY_LIMIT = 8
 # IDLE_WAIT_ON_READ = 0.2
 
 
@@ -629,21 +638,92 @@ class CommandBatch:
             *,
             report_fn: Callable[[str, str], None],
             request_exit_fn: Callable[[], bool],
+            concurrency_limit: int,
     ) -> bool:
-        # TODO, concurrent execution.
-        return self._exec_blocking_single(report_fn, request_exit_fn)
+        # Run up to `concurrency_limit` commands side by side, reading whatever output each has available.
+        # Progress of the running commands is combined into a single progress report.
+        cmd_pending = list(reversed(self._batch))
+        cmd_running: List[CommandBatchItem] = []
+        # Commands which haven't been sent a value yet, the first value sent to a generator must be None.
+        cmd_unsent: Set[int] = set()
+        # The last progress of each command: `(progress, progress_range)`.
+        cmd_progress: Dict[int, Tuple[int, int]] = {}
+        request_exit = False
+
+        while cmd_pending or cmd_running:
+            if not request_exit and request_exit_fn():
+                request_exit = True
+
+            # Start commands while there is room for them (none once exiting).
+            while cmd_pending and (len(cmd_running) < concurrency_limit) and (not request_exit):
+                cmd = cmd_pending.pop()
+                assert cmd.fn_iter is None
+                cmd.fn_iter = cmd.invoke()
+                cmd.status = CommandBatchItem.STATUS_RUNNING
+                cmd_running.append(cmd)
+                cmd_unsent.add(id(cmd))
+
+            is_idle = True
+            progress_changed = False
+            for cmd in tuple(cmd_running):
+                assert cmd.fn_iter is not None
+                send_arg: Optional[bool] = request_exit
+                if id(cmd) in cmd_unsent:
+                    cmd_unsent.remove(id(cmd))
+                    send_arg = None
+                try:
+                    json_messages = cmd.fn_iter.send(send_arg)  # type: ignore
+                except StopIteration:
+                    cmd.status = CommandBatchItem.STATUS_COMPLETE
+                    cmd_running.remove(cmd)
+                    is_idle = False
+                    continue
+
+                for ty, msg in json_messages:
+                    is_idle = False
+                    cmd.msg_type = ty
+                    cmd.msg_info = msg
+                    if ty == 'PROGRESS':
+                        cmd_progress[id(cmd)] = (msg[2], msg[3])
+                        progress_changed = True
+                        continue
+
+                    if ty == 'ERROR':
+                        cmd.has_error = True
+                    elif ty == 'WARN':
+                        cmd.has_warning = True
+                    if ty != 'DONE':
+                        cmd.msg_log.append((ty, msg))
+                    report_fn(ty, msg)
+
+            if progress_changed:
+                report_fn('PROGRESS', (  # type: ignore
+                    self.title,
+                    'BYTE',
+                    sum(progress for progress, _ in cmd_progress.values()),
+                    sum(progress_range for _, progress_range in cmd_progress.values()),
+                ))
+
+            # Generators run with `use_idle=False` don't wait on their own.
+            if is_idle:
+                time.sleep(IDLE_WAIT_ON_READ)
+
+        return request_exit
 
     def exec_blocking(
             self,
             report_fn: Callable[[str, str], None],
             request_exit_fn: Callable[[], bool],
             concurrent: bool,
+            *,
+            concurrency_limit: int = COMMAND_BATCH_CONCURRENCY_LIMIT,
     ) -> bool:
         # Blocking execution & finish.
         if concurrent:
             return self._exec_blocking_multi(
                 report_fn=report_fn,
                 request_exit_fn=request_exit_fn,
+                concurrency_limit=max(1, concurrency_limit),
             )
         return self._exec_blocking_single(report_fn, request_exit_fn)
 
@@ -814,6 +894,7 @@ class _RepoCacheEntry:
         "remote_url",
 
         "_pkg_manifest_local",
+        "_pkg_manifest_local_cache",
         "_pkg_manifest_remote",
         "_pkg_manifest_remote_mtime",
         "_pkg_manifest_remote_has_warning"
@@ -825,6 +906,8 @@ class _RepoCacheEntry:
         self.remote_url = remote_url
         # Manifest data per package loaded from the packages local JSON.
         self._pkg_manifest_local: Optional[Dict[str, Dict[str, Any]]] = None
+        # Valid manifests per package directory name, see: `REPO_LOCAL_MANIFEST_CACHE`.
+        self._pkg_manifest_local_cache: Optional[Dict[str, Dict[str, Any]]] = None
         self._pkg_manifest_remote: Optional[Dict[str, Dict[str, Any]]] = None
         self._pkg_manifest_remote_mtime = 0
         # Avoid many noisy prints.
@@ -948,6 +1031,44 @@ class _RepoCacheEntry:
             assert json_mtime is not None
             self._pkg_manifest_remote_mtime = json_mtime
 
+    def _pkg_manifest_local_cache_ensure(self) -> Dict[str, Dict[str, Any]]:
+        if self._pkg_manifest_local_cache is not None:
+            return self._pkg_manifest_local_cache
+
+        # A missing, corrupt or outdated cache is ignored, all manifests are read again.
+        cache_entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            cache_data = json_from_filepath(os.path.join(self.directory, REPO_LOCAL_MANIFEST_CACHE))
+        except Exception:
+            cache_data = None
+        if cache_data is not None and cache_data.get("version") == REPO_LOCAL_MANIFEST_CACHE_VERSION:
+            if isinstance(entries := cache_data.get("entries"), dict):
+                cache_entries = entries
+
+        self._pkg_manifest_local_cache = cache_entries
+        return cache_entries
+
+    def _pkg_manifest_local_cache_write(self) -> None:
+        assert self._pkg_manifest_local_cache is not None
+        filepath_cache = os.path.join(self.directory, REPO_LOCAL_MANIFEST_CACHE)
+        # Don't create the private directory, the cache is written once the repository has been initialized.
+        if not os.path.isdir(os.path.dirname(filepath_cache)):
+            return
+
+        # Write to a temporary file first, an interrupted write must not leave a corrupt cache.
+        # Failing to write is not an error, the manifests are read again next time.
+        filepath_cache_temp = filepath_cache + "@"
+        try:
+            json_to_filepath(filepath_cache_temp, {
+                "version": REPO_LOCAL_MANIFEST_CACHE_VERSION,
+                "entries": self._pkg_manifest_local_cache,
+            })
+            os.replace(filepath_cache_temp, filepath_cache)
+        except Exception as ex:
+            print("Error writing manifest cache:", ex)
+            if os.path.exists(filepath_cache_temp):
+                os.remove(filepath_cache_temp)
+
     def pkg_manifest_from_local_ensure(
             self,
             *,
@@ -963,6 +1084,11 @@ class _RepoCacheEntry:
                 error_fn=error_fn,
             )
             pkg_manifest_local = {}
+
+            # Only re-read & validate manifests which changed since they were cached.
+            cache_entries = self._pkg_manifest_local_cache_ensure()
+            cache_entries_next: Dict[str, Dict[str, Any]] = {}
+            cache_changed = False
             try:
                 dir_entries = os.scandir(self.directory)
             except BaseException as ex:
@@ -989,13 +1115,34 @@ class _RepoCacheEntry:
 
                 filepath_toml = os.path.join(self.directory, filename, PKG_MANIFEST_FILENAME_TOML)
                 try:
-                    item_local = toml_from_filepath(filepath_toml)
+                    st = os.stat(filepath_toml)
+                except FileNotFoundError:
+                    continue
                 except BaseException as ex:
-                    item_local = None
                     error_fn(ex)
-
-                if item_local is None:
                     continue
+                stat_key = [st.st_size, st.st_mtime_ns, st.st_ino]
+
+                if ((cache_entry := cache_entries.get(filename)) is not None) and (cache_entry.get("stat") == stat_key):
+                    item_local = cache_entry["manifest"]
+                else:
+                    cache_changed = True
+                    try:
+                        item_local = toml_from_filepath(filepath_toml)
+                    except BaseException as ex:
+                        item_local = None
+                        error_fn(ex)
+
+                    if item_local is None:
+                        continue
+
+                    # Validate so local-only packages with invalid manifests aren't used.
+                    # Invalid manifests are not cached so the error is reported each time.
+                    if (error_str := pkg_manifest_dict_is_valid_or_error(item_local, from_repo=False, strict=False)):
+                        error_fn(Exception(error_str))
+                        continue
+
+                cache_entries_next[filename] = {"stat": stat_key, "manifest": item_local}
 
                 pkg_idname = item_local["id"]
                 if has_remote:
@@ -1009,12 +1156,12 @@ class _RepoCacheEntry:
                 else:
                     pkg_idname = filename
 
-                # Validate so local-only packages with invalid manifests aren't used.
-                if (error_str := pkg_manifest_dict_is_valid_or_error(item_local, from_repo=False, strict=False)):
-                    error_fn(Exception(error_str))
-                    continue
-
                 pkg_manifest_local[pkg_idname] = item_local
+
+            # Removed packages also change the cache.
+            if (dir_entries is not None) and (cache_changed or (len(cache_entries_next) != len(cache_entries))):
+                self._pkg_manifest_local_cache = cache_entries_next
+                self._pkg_manifest_local_cache_write()
             self._pkg_manifest_local = pkg_manifest_local
         return self._pkg_manifest_local
 
@@ -9,6 +9,8 @@ Command for managing Blender extensions.
 
 
 import argparse
+import collections
+import concurrent.futures
 import contextlib
 import hashlib  # for SHA1 check-summing files.
 import io
@@ -17,19 +19,25 @@ import os
 import re
 import shutil
 import signal  # Override `Ctrl-C`.
+import struct
 import sys
+import threading
+import time
 import tomllib
 import urllib.error  # For `URLError`.
 import urllib.parse  # For `urljoin`.
 import urllib.request  # For accessing remote `https://` paths.
 import zipfile
+import zlib  # For `gzip` encoded downloads.
 
 
 from typing import (
     Any,
+    Deque,
     Dict,
     Generator,
     IO,
+    Iterator,
     Optional,
     Sequence,
     List,
@@ -74,12 +82,20 @@ PKG_EXT = ".zip"
 
 PKG_REPO_LIST_FILENAME = "bl_ext_repo.json"
 
+# Stored next to the local `PKG_REPO_LIST_FILENAME`, the HTTP validators (`ETag` & `Last-Modified`)
+# of the last sync so the remote data is only downloaded again when it changed.
+PKG_REPO_LIST_VALIDATORS_EXT = ".validators"
+
 # Only for building.
 PKG_MANIFEST_FILENAME_TOML = "blender_manifest.toml"
 
 # This directory is in the local repository.
 REPO_LOCAL_PRIVATE_DIR = ".blender_ext"
 
+# Locate inside `REPO_LOCAL_PRIVATE_DIR` of the server repository,
+# meta-data of archives from the last `server-generate` (so unchanged archives aren't read again).
+REPO_SERVER_GENERATE_CACHE_FILENAME = "server_generate_cache.json"
+
 MESSAGE_TYPES = {'STATUS', 'PROGRESS', 'WARN', 'ERROR', 'PATH', 'DONE'}
 
 RE_MANIFEST_SEMVER = re.compile(
@@ -103,6 +119,14 @@ RE_CONTROL_CHARS = re.compile(r'[\x00-\x1f\x7f-\x9f]')
 # 16kb to be responsive even on slow connections.
 CHUNK_SIZE_DEFAULT = 1 << 14
 
+# The number of packages downloaded & installed at once.
+# Installing many small packages is dominated by the latency of each request,
+# so overlap them without opening an unreasonable number of connections to the server.
+INSTALL_JOBS_MAX = 8
+
+# How often (in seconds) progress is reported while waiting on concurrent downloads.
+PROGRESS_INTERVAL_IN_SECONDS = 0.05
+
 # Standard out may be communicating with a parent process,
 # arbitrary prints are NOT acceptable.
 
@@ -216,6 +240,29 @@ class CleanupPathsContext:
                 pass
 
 
+class _DownloadProgress:
+    """
+    Progress shared by concurrent downloads.
+    """
+    __slots__ = (
+        "size",
+        "size_expected",
+        "cancel",
+        "_lock",
+    )
+
+    def __init__(self, *, size_expected: int) -> None:
+        self.size = 0
+        self.size_expected = size_expected
+        # Set to stop the downloads which are still running.
+        self.cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def add(self, size: int) -> None:
+        with self._lock:
+            self.size += size
+
+
 # -----------------------------------------------------------------------------
 # Generic Functions
 
@@ -356,6 +403,69 @@ def filepath_skip_compress(filepath: str) -> bool:
     ))
 
 
+def zipfile_member_raw_data_iter(
+        zip_fh: zipfile.ZipFile,
+        zinfo: zipfile.ZipInfo,
+        *,
+        chunk_size: int,
+) -> Generator[bytes, None, None]:
+    """
+    Yield the data of a member as it's stored in the archive (without decompressing it).
+    """
+    fh = zip_fh.fp
+    assert fh is not None
+    fh.seek(zinfo.header_offset)
+    header = fh.read(30)
+    if len(header) != 30 or header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile("Bad local header for {!r}".format(zinfo.filename))
+    # Skip the file-name & extra field which follow the fixed size header.
+    filename_len, extra_len = struct.unpack("<HH", header[26:30])
+    fh.seek(filename_len + extra_len, os.SEEK_CUR)
+
+    size_remaining = zinfo.compress_size
+    while size_remaining > 0:
+        data = fh.read(min(chunk_size, size_remaining))
+        if not data:
+            raise zipfile.BadZipFile("Truncated data for {!r}".format(zinfo.filename))
+        size_remaining -= len(data)
+        yield data
+
+
+def zipfile_write_member_raw(
+        zip_fh: zipfile.ZipFile,
+        zinfo_src: zipfile.ZipInfo,
+        data_iter: Iterator[bytes],
+) -> None:
+    """
+    Write a member which has already been compressed (typically read from another archive),
+    ``zinfo_src`` must contain the sizes & CRC of the data.
+
+    .. note:: ``zipfile`` has no API for this, so the archive is written to in the same way ``ZipFile.open`` does.
+    """
+    zinfo = zipfile.ZipInfo(zinfo_src.filename, date_time=zinfo_src.date_time)
+    zinfo.compress_type = zinfo_src.compress_type
+    # Sizes are written in the header, so a data-descriptor is never needed.
+    zinfo.flag_bits = zinfo_src.flag_bits & ~0x08
+    zinfo.create_system = zinfo_src.create_system
+    zinfo.external_attr = zinfo_src.external_attr
+    zinfo.CRC = zinfo_src.CRC
+    zinfo.compress_size = zinfo_src.compress_size
+    zinfo.file_size = zinfo_src.file_size
+
+    fh = zip_fh.fp
+    assert fh is not None
+    fh.seek(zip_fh.start_dir)
+    zinfo.header_offset = fh.tell()
+    zip64 = max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT
+    fh.write(zinfo.FileHeader(zip64))
+    for data in data_iter:
+        fh.write(data)
+    zip_fh.start_dir = fh.tell()
+
+    zip_fh.filelist.append(zinfo)
+    zip_fh.NameToInfo[zinfo.filename] = zinfo
+
+
 def pkg_manifest_from_dict_and_validate_impl(
         data: Dict[Any, Any],
         *,
@@ -680,6 +790,9 @@ def url_retrieve_to_filepath_iter(
 ) -> Generator[Tuple[int, int, Any], None, None]:
     # Handle temporary file setup.
     with open(filepath, 'wb') as fh_output:
+        # Only used when requested with an `Accept-Encoding` header,
+        # the size (for progress) is the size of the encoded data.
+        decompress = None
         for block, size, response_headers in url_retrieve_to_data_iter(
                 url,
                 headers=headers,
@@ -687,9 +800,19 @@ def url_retrieve_to_filepath_iter(
                 chunk_size=chunk_size,
                 timeout_in_seconds=timeout_in_seconds,
         ):
-            fh_output.write(block)
+            if decompress is None:
+                if response_headers.get("Content-Encoding", "").lower() == "gzip":
+                    decompress = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                fh_output.write(block)
+            else:
+                fh_output.write(decompress.decompress(block))
             yield (len(block), size, response_headers)
 
+        if decompress is not None:
+            fh_output.write(decompress.flush())
+            if not decompress.eof:
+                raise zlib.error("retrieval incomplete: truncated gzip data")
+
 
 def filepath_retrieve_to_filepath_iter(
         filepath_src: str,
@@ -740,23 +863,24 @@ def url_retrieve_to_filepath_iter_or_filesystem(
         headers: Dict[str, str],
         chunk_size: int,
         timeout_in_seconds: float,
-) -> Generator[Tuple[int, int], None, None]:
+) -> Generator[Tuple[int, int, Any], None, None]:
+    # The response headers are None for the file-system.
     if is_filesystem:
-        yield from filepath_retrieve_to_filepath_iter(
+        for (read, size) in filepath_retrieve_to_filepath_iter(
             path,
             filepath,
             chunk_size=chunk_size,
             timeout_in_seconds=timeout_in_seconds,
-        )
+        ):
+            yield (read, size, None)
     else:
-        for (read, size, _response_headers) in url_retrieve_to_filepath_iter(
+        yield from url_retrieve_to_filepath_iter(
             path,
             filepath,
             headers=headers,
             chunk_size=chunk_size,
             timeout_in_seconds=timeout_in_seconds,
-        ):
-            yield (read, size)
+        )
 
 
 def pkg_idname_is_valid_or_error(pkg_idname: str) -> Optional[str]:
@@ -1223,6 +1347,68 @@ def repo_local_private_dir_ensure_with_subdir(*, local_dir: str, subdir: str) ->
     return local_private_subdir
 
 
+def repo_sync_validators_headers(
+        *,
+        local_json_path: str,
+        local_json_validators_path: str,
+        remote_json_path: str,
+) -> Dict[str, str]:
+    """
+    Return headers for a conditional request of the remote JSON,
+    empty when there are no validators for the local JSON as it is now.
+    """
+    try:
+        with open(local_json_validators_path, "r", encoding="utf-8") as fh:
+            validators = json.load(fh)
+    except Exception:
+        return {}
+
+    if not isinstance(validators, dict) or validators.get("url") != remote_json_path:
+        return {}
+
+    # The local JSON may have been removed or replaced since it was downloaded.
+    if not os.path.exists(local_json_path):
+        return {}
+    if [validators.get("size"), validators.get("hash")] != list(sha256_from_file(local_json_path, hash_prefix=True)):
+        return {}
+
+    headers = {}
+    if etag := validators.get("etag"):
+        headers["If-None-Match"] = etag
+    if last_modified := validators.get("last_modified"):
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def repo_sync_validators_write(
+        *,
+        local_json_path: str,
+        local_json_validators_path: str,
+        remote_json_path: str,
+        response_headers: Any,
+) -> None:
+    """
+    Store the validators of the response the local JSON was downloaded from.
+    """
+    etag = response_headers.get("ETag") if response_headers is not None else None
+    last_modified = response_headers.get("Last-Modified") if response_headers is not None else None
+
+    if not (etag or last_modified):
+        if os.path.exists(local_json_validators_path):
+            os.unlink(local_json_validators_path)
+        return
+
+    size, hash_value = sha256_from_file(local_json_path, hash_prefix=True)
+    with open(local_json_validators_path, "w", encoding="utf-8") as fh:
+        json.dump({
+            "url": remote_json_path,
+            "etag": etag,
+            "last_modified": last_modified,
+            "size": size,
+            "hash": hash_value,
+        }, fh)
+
+
 def repo_sync_from_remote(
         *,
         msg_fn: MessageFn,
@@ -1250,6 +1436,17 @@ def repo_sync_from_remote(
     local_json_path = os.path.join(local_private_dir, PKG_REPO_LIST_FILENAME)
     local_json_path_temp = local_json_path + "@"
 
+    headers = url_request_headers_create(accept_json=True, user_agent=online_user_agent)
+    # Validators always describe the JSON at its final location (without the `extension_override`).
+    local_json_validators_path = local_json_path + PKG_REPO_LIST_VALIDATORS_EXT
+    if not is_repo_filesystem:
+        headers.update(repo_sync_validators_headers(
+            local_json_path=local_json_path,
+            local_json_validators_path=local_json_validators_path,
+            remote_json_path=remote_json_path,
+        ))
+        headers["Accept-Encoding"] = "gzip"
+
     assert extension_override != "@"
     if extension_override:
         local_json_path = local_json_path + extension_override
@@ -1265,13 +1462,14 @@ def repo_sync_from_remote(
 
         # No progress for file copying, assume local file system is fast enough.
         # `shutil.copyfile(remote_json_path, local_json_path_temp)`.
+        response_headers = None
         try:
             read_total = 0
-            for (read, size) in url_retrieve_to_filepath_iter_or_filesystem(
+            for (read, size, response_headers) in url_retrieve_to_filepath_iter_or_filesystem(
                     remote_json_path,
                     local_json_path_temp,
                     is_filesystem=is_repo_filesystem,
-                    headers=url_request_headers_create(accept_json=True, user_agent=online_user_agent),
+                    headers=headers,
                     chunk_size=CHUNK_SIZE_DEFAULT,
                     timeout_in_seconds=timeout_in_seconds,
             ):
@@ -1281,6 +1479,14 @@ def repo_sync_from_remote(
                 read_total += read
             del read_total
 
+        except urllib.error.HTTPError as ex:
+            if ex.code != 304:
+                message_error(msg_fn, "sync: URL error ({:s}) reading {!r}!".format(str(ex), remote_url))
+                return False
+            # Not modified, the local JSON is already up to date.
+            request_exit |= message_status(msg_fn, "Sync remote data unchanged")
+            request_exit |= message_status(msg_fn, "Sync complete: {:s}".format(remote_url))
+            return not request_exit
         except FileNotFoundError as ex:
             message_error(msg_fn, "sync: file-not-found ({:s}) reading {!r}!".format(str(ex), remote_url))
             return False
@@ -1313,6 +1519,14 @@ def repo_sync_from_remote(
         # If this is a valid JSON, overwrite the existing file.
         os.rename(local_json_path_temp, local_json_path)
 
+        if not is_repo_filesystem:
+            repo_sync_validators_write(
+                local_json_path=local_json_path,
+                local_json_validators_path=local_json_validators_path,
+                remote_json_path=remote_json_path,
+                response_headers=response_headers,
+            )
+
         if extension_override:
             request_exit |= message_path(msg_fn, os.path.relpath(local_json_path, local_dir))
 
@@ -1490,6 +1704,19 @@ def generic_arg_package_output_filepath(subparse: argparse.ArgumentParser) -> No
     )
 
 
+def generic_arg_build_verbose(subparse: argparse.ArgumentParser) -> None:
+    subparse.add_argument(
+        "--verbose",
+        dest="verbose",
+        action="store_true",
+        help=(
+            "Report each file added to the archive,\n"
+            "including the time spent compressing and if it was reused from the previous archive."
+        ),
+        default=False,
+    )
+
+
 def generic_arg_output_type(subparse: argparse.ArgumentParser) -> None:
     subparse.add_argument(
         "--output-type",
@@ -1605,22 +1832,49 @@ class subcmd_server:
             "blocklist": [],
             "data": repo_data,
         }
-        for entry in os.scandir(repo_dir):
-            if not entry.name.endswith(PKG_EXT):
-                continue
 
-            # Harmless, but skip directories.
-            if entry.is_dir():
-                message_warn(msg_fn, "found unexpected directory {!r}".format(entry.name))
-                continue
+        filepath_cache = os.path.join(
+            repo_local_private_dir_ensure(local_dir=repo_dir),
+            REPO_SERVER_GENERATE_CACHE_FILENAME,
+        )
+        cache_entries = subcmd_server._generate_cache_read(filepath_cache)
+        cache_entries_next: Dict[str, Dict[str, Any]] = {}
+
+        # Archives are read & hashed in parallel, unchanged archives are taken from the cache.
+        archives: List[Tuple[str, "concurrent.futures.Future[Dict[str, Any]]"]] = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            for entry in os.scandir(repo_dir):
+                if not entry.name.endswith(PKG_EXT):
+                    continue
+
+                # Harmless, but skip directories.
+                if entry.is_dir():
+                    message_warn(msg_fn, "found unexpected directory {!r}".format(entry.name))
+                    continue
+
+                filename = entry.name
+                filepath = os.path.join(repo_dir, filename)
+                st = entry.stat()
+                stat_key = [st.st_size, st.st_mtime_ns, st.st_ino]
+
+                future: "concurrent.futures.Future[Dict[str, Any]]"
+                if (cache_entry := cache_entries.get(filename)) is not None and cache_entry["stat"] == stat_key:
+                    future = concurrent.futures.Future()
+                    future.set_result(cache_entry)
+                else:
+                    future = executor.submit(subcmd_server._generate_cache_entry, filepath, stat_key)
+                archives.append((filename, future))
+
+        for filename, future in archives:
+            cache_entry = future.result()
+            cache_entries_next[filename] = cache_entry
 
-            filename = entry.name
             filepath = os.path.join(repo_dir, filename)
-            manifest = pkg_manifest_from_archive_and_validate(filepath, strict=False)
-            if isinstance(manifest, str):
-                message_warn(msg_fn, "archive validation failed {!r}, error: {:s}".format(filepath, manifest))
+            if (error := cache_entry.get("error")) is not None:
+                message_warn(msg_fn, "archive validation failed {!r}, error: {:s}".format(filepath, error))
                 continue
-            manifest_dict = manifest._asdict()
+            # Copy as keys are added & removed below.
+            manifest_dict = dict(cache_entry["manifest"])
 
             repo_data_idname_unique_len = len(repo_data_idname_unique)
             repo_data_idname_unique.add(manifest_dict["id"])
@@ -1650,10 +1904,8 @@ class subcmd_server:
             manifest_dict["archive_url"] = "./" + filename
 
             # Add archive variables, see: `PkgManifest_Archive`.
-            (
-                manifest_dict["archive_size"],
-                manifest_dict["archive_hash"],
-            ) = sha256_from_file(filepath, hash_prefix=True)
+            manifest_dict["archive_size"] = cache_entry["archive_size"]
+            manifest_dict["archive_hash"] = cache_entry["archive_hash"]
 
             repo_data.append(manifest_dict)
 
@@ -1661,10 +1913,53 @@ class subcmd_server:
 
         with open(filepath_repo_json, "w", encoding="utf-8") as fh:
             json.dump(repo_gen_dict, fh, indent=2)
+
+        # Entries of removed archives are dropped.
+        subcmd_server._generate_cache_write(filepath_cache, cache_entries_next)
+
         message_status(msg_fn, "found {:d} packages.".format(len(repo_data)))
 
         return True
 
+    @staticmethod
+    def _generate_cache_entry(filepath: str, stat_key: List[int]) -> Dict[str, Any]:
+        # Validate & hash an archive (runs in a worker thread).
+        manifest = pkg_manifest_from_archive_and_validate(filepath, strict=False)
+        if isinstance(manifest, str):
+            return {"stat": stat_key, "error": manifest}
+
+        archive_size, archive_hash = sha256_from_file(filepath, hash_prefix=True)
+        return {
+            "stat": stat_key,
+            "manifest": manifest._asdict(),
+            "archive_size": archive_size,
+            "archive_hash": archive_hash,
+        }
+
+    @staticmethod
+    def _generate_cache_read(filepath_cache: str) -> Dict[str, Dict[str, Any]]:
+        # A missing, corrupt or outdated cache is ignored, all archives are read again.
+        try:
+            with open(filepath_cache, "r", encoding="utf-8") as fh:
+                cache_data = json.load(fh)
+        except Exception:
+            return {}
+
+        if not isinstance(cache_data, dict) or cache_data.get("version") != VERSION:
+            return {}
+        entries = cache_data.get("entries")
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    @staticmethod
+    def _generate_cache_write(filepath_cache: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        # Write to a temporary file first, an interrupted write must not leave a corrupt cache.
+        filepath_cache_temp = filepath_cache + "@"
+        with open(filepath_cache_temp, "w", encoding="utf-8") as fh:
+            json.dump({"version": VERSION, "entries": entries}, fh)
+        os.replace(filepath_cache_temp, filepath_cache)
+
 
 class subcmd_client:
 
@@ -1948,148 +2243,203 @@ class subcmd_client:
 
         request_exit = False
 
+        headers = url_request_headers_create(accept_json=False, user_agent=online_user_agent)
+        jobs = max(1, min(INSTALL_JOBS_MAX, len(packages_info)))
+
         # Ensure all cache is cleared (when `local_cache` is disabled) no matter the cause of exiting.
         files_to_clean: List[str] = []
         with CleanupPathsContext(files=files_to_clean, directories=()):
-            for manifest_archive in packages_info:
-                pkg_idname = manifest_archive.manifest.id
-                # Archive name.
-                archive_size_expected = manifest_archive.archive_size
-                archive_hash_expected = manifest_archive.archive_hash
-                pkg_archive_url = manifest_archive.archive_url
-
-                # Local path.
-                filepath_local_cache_archive = os.path.join(local_cache_dir, pkg_idname + PKG_EXT)
-
-                if not local_cache:
-                    files_to_clean.append(filepath_local_cache_archive)
-
-                # Remote path.
-                if pkg_archive_url.startswith("./"):
-                    if is_repo_filesystem:
-                        filepath_remote_archive = os.path.join(remote_url, pkg_archive_url[2:])
-                    else:
-                        if REMOTE_REPO_HAS_JSON_IMPLIED:
-                            # TODO: use `urllib.parse.urlsplit(..)`.
-                            # NOTE: strip the path until the directory.
-                            # Convert: `https://foo.bar/bl_ext_repo.json` -> https://foo.bar/ARCHIVE_NAME
-                            filepath_remote_archive = urllib.parse.urljoin(
-                                remote_url.rpartition("/")[0],
-                                pkg_archive_url[2:],
-                            )
-                        else:
-                            filepath_remote_archive = urllib.parse.urljoin(remote_url, pkg_archive_url[2:])
-                    is_pkg_filesystem = is_repo_filesystem
-                else:
-                    filepath_remote_archive = pkg_archive_url
-                    is_pkg_filesystem = repo_is_filesystem(remote_url=pkg_archive_url)
+            progress = _DownloadProgress(size_expected=sum(
+                manifest_archive.archive_size for manifest_archive in packages_info
+            ))
+            if len(packages_info) == 1:
+                progress_text = "Downloading \"{:s}\"".format(packages_info[0].manifest.id)
+            else:
+                progress_text = "Downloading {:d} packages".format(len(packages_info))
+
+            # NOTE: the executor is exited before the files are cleaned, so nothing is still writing to them.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                futures = []
+                for manifest_archive in packages_info:
+                    # Local path.
+                    filepath_local_cache_archive = os.path.join(local_cache_dir, manifest_archive.manifest.id + PKG_EXT)
+
+                    if not local_cache:
+                        files_to_clean.append(filepath_local_cache_archive)
+
+                    futures.append(executor.submit(
+                        subcmd_client._install_package_download_to_cache,
+                        progress,
+                        manifest_archive=manifest_archive,
+                        remote_url=remote_url,
+                        is_repo_filesystem=is_repo_filesystem,
+                        filepath_local_cache_archive=filepath_local_cache_archive,
+                        local_cache=local_cache,
+                        headers=headers,
+                        timeout_in_seconds=timeout_in_seconds,
+                    ))
+                del filepath_local_cache_archive
 
-                # Check if the cache should be used.
-                found = False
-                if os.path.exists(filepath_local_cache_archive):
-                    if (
-                            local_cache and (
-                                archive_size_expected,
-                                archive_hash_expected,
-                            ) == sha256_from_file(filepath_local_cache_archive, hash_prefix=True)
-                    ):
-                        found = True
-                    else:
-                        os.unlink(filepath_local_cache_archive)
-
-                if not found:
-                    # Create `filepath_local_cache_archive`.
-                    filename_archive_size_test = 0
-                    sha256 = hashlib.new('sha256')
-
-                    # NOTE(@ideasman42): There is more logic in the try/except block than I'd like.
-                    # Refactoring could be done to avoid that but it ends up making logic difficult to follow.
-                    try:
-                        with open(filepath_local_cache_archive, "wb") as fh_cache:
-                            for block in url_retrieve_to_data_iter_or_filesystem(
-                                    filepath_remote_archive,
-                                    is_filesystem=is_pkg_filesystem,
-                                    headers=url_request_headers_create(accept_json=False, user_agent=online_user_agent),
-                                    chunk_size=CHUNK_SIZE_DEFAULT,
-                                    timeout_in_seconds=timeout_in_seconds,
-                            ):
-                                request_exit |= message_progress(
-                                    msg_fn,
-                                    "Downloading \"{:s}\"".format(pkg_idname),
-                                    filename_archive_size_test,
-                                    archive_size_expected,
-                                    'BYTE',
-                                )
-                                if request_exit:
-                                    break
-                                fh_cache.write(block)
-                                sha256.update(block)
-                                filename_archive_size_test += len(block)
-
-                    except FileNotFoundError as ex:
-                        message_error(
-                            msg_fn,
-                            "install: file-not-found ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive),
-                        )
-                        return False
-                    except TimeoutError as ex:
-                        message_error(
-                            msg_fn,
-                            "install: timeout ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive),
-                        )
-                        return False
-                    except urllib.error.URLError as ex:
-                        message_error(
-                            msg_fn,
-                            "install: URL error ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive),
-                        )
-                        return False
-                    except BaseException as ex:
-                        message_error(
+                # Only this thread calls `msg_fn`, downloads report their progress combined.
+                pending = set(futures)
+                while pending:
+                    done, pending = concurrent.futures.wait(
+                        pending,
+                        timeout=PROGRESS_INTERVAL_IN_SECONDS,
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    )
+                    if not request_exit:
+                        request_exit |= message_progress(
                             msg_fn,
-                            "install: unexpected error ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive),
+                            progress_text,
+                            progress.size,
+                            progress.size_expected,
+                            'BYTE',
                         )
-                        return False
+                    # Stop the remaining downloads on the first failure (or when exit is requested).
+                    if request_exit or any(future.result() is not None for future in done):
+                        progress.cancel.set()
 
-                    if request_exit:
-                        return False
+            if request_exit:
+                return False
 
-                    # Validate:
-                    if filename_archive_size_test != archive_size_expected:
-                        message_warn(msg_fn, "Archive size mismatch \"{:s}\", expected {:d}, was {:d}".format(
-                            pkg_idname,
-                            archive_size_expected,
-                            filename_archive_size_test,
-                        ))
-                        return False
-                    filename_archive_hash_test = "sha256:" + sha256.hexdigest()
-                    if filename_archive_hash_test != archive_hash_expected:
-                        message_warn(msg_fn, "Archive checksum mismatch \"{:s}\", expected {:s}, was {:s}".format(
-                            pkg_idname,
-                            archive_hash_expected,
-                            filename_archive_hash_test,
-                        ))
-                        return False
-                    del filename_archive_size_test
-                    del filename_archive_hash_test
-                del found
-                del filepath_local_cache_archive
+            # Report failures in the order packages were requested.
+            has_error = False
+            for future in futures:
+                if (error := future.result()) is not None:
+                    if error[1]:
+                        msg_fn(error[0], error[1])
+                    has_error = True
+            if has_error:
+                return False
+            del has_error
 
             # All packages have been downloaded, install them.
-            for manifest_archive in packages_info:
+            # Each package extracts into its own directory so they are installed in parallel,
+            # their messages are collected and reported in order (from this thread).
+            def install_from_cache(manifest_archive: PkgManifest_Archive) -> List[Tuple[str, PrimTypeOrSeq]]:
+                messages: List[Tuple[str, PrimTypeOrSeq]] = []
+
+                def msg_fn_collect(ty: str, data: PrimTypeOrSeq) -> bool:
+                    messages.append((ty, data))
+                    return False
+
                 filepath_local_cache_archive = os.path.join(local_cache_dir, manifest_archive.manifest.id + PKG_EXT)
+                # Failing to install one package doesn't prevent installing the others.
+                subcmd_client._install_package_from_file_impl(
+                    msg_fn_collect,
+                    local_dir=local_dir,
+                    filepath_archive=filepath_local_cache_archive,
+                    manifest_compare=manifest_archive.manifest,
+                )
+                return messages
 
-                if not subcmd_client._install_package_from_file_impl(
-                        msg_fn,
-                        local_dir=local_dir,
-                        filepath_archive=filepath_local_cache_archive,
-                        manifest_compare=manifest_archive.manifest,
-                ):
-                    # The package failed to install.
-                    continue
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+                for messages in executor.map(install_from_cache, packages_info):
+                    for ty, data in messages:
+                        msg_fn(ty, data)
 
         return True
 
+    @staticmethod
+    def _install_package_download_to_cache(
+            progress: "_DownloadProgress",
+            *,
+            manifest_archive: PkgManifest_Archive,
+            remote_url: str,
+            is_repo_filesystem: bool,
+            filepath_local_cache_archive: str,
+            local_cache: bool,
+            headers: Dict[str, str],
+            timeout_in_seconds: float,
+    ) -> Optional[Tuple[str, str]]:
+        # Download a package archive into the local cache (runs in a worker thread).
+        # Return a message type & text on failure, the text is empty when the download was canceled.
+        pkg_idname = manifest_archive.manifest.id
+        # Archive name.
+        archive_size_expected = manifest_archive.archive_size
+        archive_hash_expected = manifest_archive.archive_hash
+        pkg_archive_url = manifest_archive.archive_url
+
+        # Remote path.
+        if pkg_archive_url.startswith("./"):
+            if is_repo_filesystem:
+                filepath_remote_archive = os.path.join(remote_url, pkg_archive_url[2:])
+            else:
+                if REMOTE_REPO_HAS_JSON_IMPLIED:
+                    # TODO: use `urllib.parse.urlsplit(..)`.
+                    # NOTE: strip the path until the directory.
+                    # Convert: `https://foo.bar/bl_ext_repo.json` -> https://foo.bar/ARCHIVE_NAME
+                    filepath_remote_archive = urllib.parse.urljoin(
+                        remote_url.rpartition("/")[0],
+                        pkg_archive_url[2:],
+                    )
+                else:
+                    filepath_remote_archive = urllib.parse.urljoin(remote_url, pkg_archive_url[2:])
+            is_pkg_filesystem = is_repo_filesystem
+        else:
+            filepath_remote_archive = pkg_archive_url
+            is_pkg_filesystem = repo_is_filesystem(remote_url=pkg_archive_url)
+
+        # Check if the cache should be used.
+        if os.path.exists(filepath_local_cache_archive):
+            if (
+                    local_cache and (
+                        archive_size_expected,
+                        archive_hash_expected,
+                    ) == sha256_from_file(filepath_local_cache_archive, hash_prefix=True)
+            ):
+                progress.add(archive_size_expected)
+                return None
+            os.unlink(filepath_local_cache_archive)
+
+        # Create `filepath_local_cache_archive`.
+        filename_archive_size_test = 0
+        sha256 = hashlib.new('sha256')
+
+        # NOTE(@ideasman42): There is more logic in the try/except block than I'd like.
+        # Refactoring could be done to avoid that but it ends up making logic difficult to follow.
+        try:
+            with open(filepath_local_cache_archive, "wb") as fh_cache:
+                for block in url_retrieve_to_data_iter_or_filesystem(
+                        filepath_remote_archive,
+                        is_filesystem=is_pkg_filesystem,
+                        headers=headers,
+                        chunk_size=CHUNK_SIZE_DEFAULT,
+                        timeout_in_seconds=timeout_in_seconds,
+                ):
+                    if progress.cancel.is_set():
+                        return ('ERROR', "")
+                    fh_cache.write(block)
+                    sha256.update(block)
+                    filename_archive_size_test += len(block)
+                    progress.add(len(block))
+
+        except FileNotFoundError as ex:
+            return ('ERROR', "install: file-not-found ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive))
+        except TimeoutError as ex:
+            return ('ERROR', "install: timeout ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive))
+        except urllib.error.URLError as ex:
+            return ('ERROR', "install: URL error ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive))
+        except BaseException as ex:
+            return ('ERROR', "install: unexpected error ({:s}) reading {!r}!".format(str(ex), filepath_remote_archive))
+
+        # Validate:
+        if filename_archive_size_test != archive_size_expected:
+            return ('WARN', "Archive size mismatch \"{:s}\", expected {:d}, was {:d}".format(
+                pkg_idname,
+                archive_size_expected,
+                filename_archive_size_test,
+            ))
+        filename_archive_hash_test = "sha256:" + sha256.hexdigest()
+        if filename_archive_hash_test != archive_hash_expected:
+            return ('WARN', "Archive checksum mismatch \"{:s}\", expected {:s}, was {:s}".format(
+                pkg_idname,
+                archive_hash_expected,
+                filename_archive_hash_test,
+            ))
+        return None
+
     @staticmethod
     def uninstall_packages(
             msg_fn: MessageFn,
@@ -2162,6 +2512,7 @@ class subcmd_author:
             pkg_source_dir: str,
             pkg_output_dir: str,
             pkg_output_filepath: str,
+            verbose: bool = False,
     ) -> bool:
         if not os.path.isdir(pkg_source_dir):
             message_error(msg_fn, "Missing local \"{:s}\"".format(pkg_source_dir))
@@ -2217,7 +2568,139 @@ class subcmd_author:
                 message_status(msg_fn, "Error creating archive \"{:s}\"".format(str(ex)))
                 return False
 
+            # Compressed data of unchanged files is copied from the previous archive.
+            zip_fh_prev = subcmd_author._build_archive_prev_or_none(outfile)
+
             with contextlib.closing(zip_fh_context) as zip_fh:
+                try:
+                    if not subcmd_author._build_archive_write(
+                            msg_fn,
+                            zip_fh=zip_fh,
+                            zip_fh_prev=zip_fh_prev,
+                            pkg_source_dir=pkg_source_dir,
+                            filenames_root_exclude=filenames_root_exclude,
+                            verbose=verbose,
+                    ):
+                        return False
+                finally:
+                    if zip_fh_prev is not None:
+                        zip_fh_prev.close()
+
+                request_exit |= message_status(msg_fn, "complete")
+                if request_exit:
+                    return False
+
+            if os.path.exists(outfile):
+                os.unlink(outfile)
+            os.rename(outfile_temp, outfile)
+
+        message_status(msg_fn, "created \"{:s}\", {:d}".format(outfile, os.path.getsize(outfile)))
+        return True
+
+    @staticmethod
+    def _build_archive_prev_or_none(filepath: str) -> Optional[zipfile.ZipFile]:
+        # A missing or corrupt archive is ignored, all files are compressed again.
+        if not os.path.exists(filepath):
+            return None
+        try:
+            return zipfile.ZipFile(filepath, "r")
+        except Exception:
+            return None
+
+    @staticmethod
+    def _build_archive_member_compress(
+            filepath_abs: str,
+            filepath_rel: str,
+            crc_prev: Optional[int],
+    ) -> Tuple[float, Optional[Tuple[zipfile.ZipInfo, bytes]]]:
+        # Compress a file (runs in a worker thread, LZMA releases the GIL while compressing).
+        # When the files CRC matches `crc_prev` the previously compressed data is used and None is returned.
+        # The time spent is returned too (so it can be reported).
+        time_start = time.monotonic()
+        crc = 0
+        with open(filepath_abs, "rb") as fh:
+            while (data := fh.read(CHUNK_SIZE_DEFAULT * 64)):
+                crc = zlib.crc32(data, crc)
+        if crc == crc_prev:
+            return time.monotonic() - time_start, None
+
+        # Compress into an in-memory archive, the member is then copied into the archive being built.
+        member_fh = io.BytesIO()
+        with zipfile.ZipFile(member_fh, "w", zipfile.ZIP_LZMA) as zip_fh_member:
+            zip_fh_member.write(filepath_abs, filepath_rel)
+            zinfo = zip_fh_member.filelist[0]
+            data = b"".join(zipfile_member_raw_data_iter(zip_fh_member, zinfo, chunk_size=CHUNK_SIZE_DEFAULT * 64))
+        return time.monotonic() - time_start, (zinfo, data)
+
+    @staticmethod
+    def _build_archive_write(
+            msg_fn: MessageFn,
+            *,
+            zip_fh: zipfile.ZipFile,
+            zip_fh_prev: Optional[zipfile.ZipFile],
+            pkg_source_dir: str,
+            filenames_root_exclude: Set[str],
+            verbose: bool,
+    ) -> bool:
+        request_exit = False
+
+        # Files are compressed in parallel & written in the order they're found.
+        # The number of members in-flight is limited, as each compressed member is held in memory
+        # until it's written, large packages would otherwise keep the whole compressed archive in memory.
+        workers = os.cpu_count() or 1
+        members_pending_limit = workers * 2
+        members_pending: Deque[Tuple[
+            str,
+            zipfile.ZipInfo,
+            Optional[zipfile.ZipInfo],
+            Optional["concurrent.futures.Future[Tuple[float, Optional[Tuple[zipfile.ZipInfo, bytes]]]]"],
+        ]] = collections.deque()
+
+        files_total = 0
+        files_reused = 0
+
+        def member_write() -> bool:
+            # Write the oldest pending member, return true to exit.
+            nonlocal files_reused
+            filepath_abs, zinfo, zinfo_prev, future = members_pending.popleft()
+            time_start = time.monotonic()
+            if future is None:
+                action = "stored"
+                zip_fh.write(filepath_abs, zinfo.filename, compress_type=zipfile.ZIP_STORED)
+                zinfo = zip_fh.filelist[-1]
+                time_elapsed = 0.0
+            else:
+                # Only include time spent in the worker, not time waiting on other files.
+                time_elapsed, member = future.result()
+                time_start = time.monotonic()
+                if member is None:
+                    assert zip_fh_prev is not None and zinfo_prev is not None
+                    action = "reused"
+                    files_reused += 1
+                    zinfo = zinfo_prev
+                    zipfile_write_member_raw(zip_fh, zinfo, zipfile_member_raw_data_iter(
+                        zip_fh_prev,
+                        zinfo,
+                        chunk_size=CHUNK_SIZE_DEFAULT * 64,
+                    ))
+                else:
+                    action = "compressed"
+                    zinfo, data = member
+                    zipfile_write_member_raw(zip_fh, zinfo, iter((data,)))
+            time_elapsed += time.monotonic() - time_start
+
+            if verbose:
+                return message_status(msg_fn, "{:s}: {:s} {:d} -> {:d} bytes in {:.3f}s".format(
+                    zinfo.filename,
+                    action,
+                    zinfo.file_size,
+                    zinfo.compress_size,
+                    time_elapsed,
+                ))
+            return False
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
                 for filepath_abs, filepath_rel in scandir_recursive(
                         pkg_source_dir,
                         # Be more advanced in the future, for now ignore dot-files (`.git`) .. etc.
@@ -2226,24 +2709,54 @@ class subcmd_author:
                     if filepath_rel in filenames_root_exclude:
                         continue
 
+                    files_total += 1
+
                     # Handy for testing that sub-directories:
                     # zip_fh.write(filepath_abs, manifest.id + "/" + filepath_rel)
-                    compress_type = zipfile.ZIP_STORED if filepath_skip_compress(filepath_abs) else None
-                    try:
-                        zip_fh.write(filepath_abs, filepath_rel, compress_type=compress_type)
-                    except BaseException as ex:
-                        message_status(msg_fn, "Error adding to archive \"{:s}\"".format(str(ex)))
-                        return False
+                    zinfo = zipfile.ZipInfo.from_file(filepath_abs, filepath_rel)
+                    if filepath_skip_compress(filepath_abs):
+                        # Written directly, there is nothing to gain from doing this in parallel.
+                        members_pending.append((filepath_abs, zinfo, None, None))
+                    else:
+                        # Only files with the same size & time-stamp are checked for changes.
+                        # NOTE: archives store seconds with a resolution of 2, compare the time-stamp as it's stored.
+                        zinfo_prev = zip_fh_prev.NameToInfo.get(zinfo.filename) if zip_fh_prev is not None else None
+                        if zinfo_prev is not None and not (
+                                zinfo_prev.compress_type == zipfile.ZIP_LZMA and
+                                zinfo_prev.file_size == zinfo.file_size and
+                                zinfo_prev.date_time[:5] == zinfo.date_time[:5] and
+                                zinfo_prev.date_time[5] // 2 == zinfo.date_time[5] // 2 and
+                                zinfo_prev.external_attr == zinfo.external_attr
+                        ):
+                            zinfo_prev = None
+
+                        members_pending.append((filepath_abs, zinfo, zinfo_prev, executor.submit(
+                            subcmd_author._build_archive_member_compress,
+                            filepath_abs,
+                            filepath_rel,
+                            zinfo_prev.CRC if zinfo_prev is not None else None,
+                        )))
+
+                    while len(members_pending) > members_pending_limit:
+                        request_exit |= member_write()
+                        if request_exit:
+                            break
+                    if request_exit:
+                        break
 
-                request_exit |= message_status(msg_fn, "complete")
-                if request_exit:
-                    return False
+                while members_pending and not request_exit:
+                    request_exit |= member_write()
+            except BaseException as ex:
+                executor.shutdown(cancel_futures=True)
+                message_status(msg_fn, "Error adding to archive \"{:s}\"".format(str(ex)))
+                return False
 
-            if os.path.exists(outfile):
-                os.unlink(outfile)
-            os.rename(outfile_temp, outfile)
+            if request_exit:
+                executor.shutdown(cancel_futures=True)
+                return False
 
-        message_status(msg_fn, "created \"{:s}\", {:d}".format(outfile, os.path.getsize(outfile)))
+        if verbose:
+            message_status(msg_fn, "reused {:d} of {:d} files".format(files_reused, files_total))
         return True
 
     @staticmethod
@@ -2664,6 +3177,7 @@ def argparse_create_author_build(
     generic_arg_package_source_dir(subparse)
     generic_arg_package_output_dir(subparse)
     generic_arg_package_output_filepath(subparse)
+    generic_arg_build_verbose(subparse)
 
     if args_internal:
         generic_arg_output_type(subparse)
@@ -2674,6 +3188,7 @@ def argparse_create_author_build(
             pkg_source_dir=args.source_dir,
             pkg_output_dir=args.output_dir,
             pkg_output_filepath=args.output_filepath,
+            verbose=args.verbose,
         ),
     )
 
@@ -14,6 +14,7 @@ import subprocess
 import sys
 import tempfile
 import unittest
+import zipfile
 
 import unittest.util
 
@@ -254,6 +255,24 @@ class TestCLI(unittest.TestCase):
     def test_version(self) -> None:
         self.assertEqual(command_output(["--version"]), "0.1\n")
 
+    def test_build_reuse(self) -> None:
+        source_dir = os.path.normpath(os.path.join(BASE_DIR, "..", "example_extension"))
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR_LOCAL) as temp_dir_build:
+            outfile = os.path.join(temp_dir_build, "example" + PKG_EXT)
+            args = ["build", "--source-dir", source_dir, "--output-filepath", outfile, "--verbose"]
+
+            output_json = command_output_from_json_0(args, exclude_types={"PROGRESS"})
+            self.assertIn(("STATUS", "reused 0 of 3 files"), output_json)
+
+            # Nothing changed, all compressed data is taken from the previous archive.
+            output_json = command_output_from_json_0(args, exclude_types={"PROGRESS"})
+            self.assertIn(("STATUS", "reused 3 of 3 files"), output_json)
+            with zipfile.ZipFile(outfile, "r") as zip_fh:
+                self.assertIsNone(zip_fh.testzip())
+                for filename in ("AUTHORS", "__init__.py", PKG_MANIFEST_FILENAME_TOML):
+                    with open(os.path.join(source_dir, filename), "rb") as fh:
+                        self.assertEqual(zip_fh.read(filename), fh.read())
+
 
 class TestCLI_WithRepo(unittest.TestCase):
     dirpath = ""
@@ -411,6 +430,104 @@ class TestCLI_WithRepo(unittest.TestCase):
             )
             self.assertFalse(os.path.isdir(os.path.join(temp_dir_local, "another_package")))
 
+    def test_client_sync_unchanged(self) -> None:
+        # Always over HTTP (conditional requests don't apply to the file-system),
+        # use another port in case `USE_HTTP` already started a server.
+        port = HTTP_PORT + 1
+        if REMOTE_REPO_HAS_JSON_IMPLIED:
+            dirpath_url = "http://localhost:{:d}/bl_ext_repo.json".format(port)
+        else:
+            dirpath_url = "http://localhost:{:d}".format(port)
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR_LOCAL) as temp_dir_local:
+            # TODO: only run once.
+            self.test_server_generate()
+
+            with HTTPServerContext(directory=self.dirpath, port=port):
+                output_json = command_output_from_json_0([
+                    "sync",
+                    "--remote-url", dirpath_url,
+                    "--local-dir", temp_dir_local,
+                ])
+                self.assertIn("PROGRESS", [ty for ty, _ in output_json])
+
+                # Nothing changed, nothing is downloaded (no progress).
+                output_json = command_output_from_json_0([
+                    "sync",
+                    "--remote-url", dirpath_url,
+                    "--local-dir", temp_dir_local,
+                ])
+                self.assertEqual(
+                    output_json, [
+                        ('STATUS', 'Sync repo: ' + dirpath_url),
+                        ('STATUS', 'Sync downloading remote data'),
+                        ('STATUS', 'Sync remote data unchanged'),
+                        ('STATUS', 'Sync complete: ' + dirpath_url),
+                    ]
+                )
+
+                # The local data is downloaded again once removed.
+                os.unlink(os.path.join(temp_dir_local, ".blender_ext", "bl_ext_repo.json"))
+                output_json = command_output_from_json_0([
+                    "sync",
+                    "--remote-url", dirpath_url,
+                    "--local-dir", temp_dir_local,
+                ], exclude_types={"PROGRESS"})
+                self.assertEqual(
+                    output_json, [
+                        ('STATUS', 'Sync repo: ' + dirpath_url),
+                        ('STATUS', 'Sync downloading remote data'),
+                        ('STATUS', 'Sync complete: ' + dirpath_url),
+                    ]
+                )
+                self.assertTrue(os.path.exists(os.path.join(temp_dir_local, ".blender_ext", "bl_ext_repo.json")))
+
+    def test_client_install_multiple(self) -> None:
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR_LOCAL) as temp_dir_local:
+            # TODO: only run once.
+            self.test_server_generate()
+
+            command_output_from_json_0([
+                "sync",
+                "--remote-url", self.dirpath_url,
+                "--local-dir", temp_dir_local,
+            ], exclude_types={"PROGRESS"})
+
+            # Packages are downloaded & installed concurrently, messages are still reported in order.
+            output_json = command_output_from_json_0(
+                [
+                    "install", "test_package,foo_bar,another_package",
+                    "--remote-url", self.dirpath_url,
+                    "--local-dir", temp_dir_local,
+                ],
+                exclude_types={"PROGRESS"},
+            )
+            self.assertEqual(
+                output_json, [
+                    ("STATUS", "Installed \"another_package\""),
+                    ("STATUS", "Installed \"foo_bar\""),
+                    ("STATUS", "Installed \"test_package\""),
+                ]
+            )
+            for pkg_idname in ("another_package", "foo_bar", "test_package"):
+                self.assertTrue(os.path.isdir(os.path.join(temp_dir_local, pkg_idname)))
+
+            # Not found, nothing is downloaded.
+            output_json = command_output_from_json_0(
+                [
+                    "install", "foo_bar,missing_package",
+                    "--remote-url", self.dirpath_url,
+                    "--local-dir", temp_dir_local,
+                ],
+                exclude_types={"PROGRESS"},
+                expected_returncode=1,
+            )
+            self.assertEqual(
+                output_json, [
+                    ("ERROR", "Package \"missing_package\", not found"),
+                ]
+            )
+
 
 if __name__ == "__main__":
     if USE_HTTP:
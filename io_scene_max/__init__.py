@@ -29,6 +29,8 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    if "parse_max" in locals():
+        importlib.reload(parse_max)
     if "import_max" in locals():
         importlib.reload(import_max)
 
@@ -67,6 +69,11 @@ class Import_max(bpy.types.Operator, ImportHelper):
         description="Create a new collection",
         default=False,
     )
+    use_parallel: BoolProperty(
+        name="Parallel",
+        description="Read multiple files at once in separate processes",
+        default=False,
+    )
     use_apply_matrix: BoolProperty(
         name="Apply Matrix",
         description="Use matrix to transform the objects",
@@ -126,6 +133,9 @@ class MAX_PT_import_include(bpy.types.Panel):
         layrow = layout.row(align=True)
         layrow.prop(operator, "use_collection")
         layrow.label(text="", icon='OUTLINER_COLLECTION' if operator.use_collection else 'GROUP')
+        layrow = layout.row(align=True)
+        layrow.prop(operator, "use_parallel")
+        layrow.label(text="", icon='SORTTIME' if operator.use_parallel else 'TIME')
 
 
 class MAX_PT_import_transform(bpy.types.Panel):
@@ -34,6 +34,7 @@ bl_info = {
 import bpy
 from mathutils import Vector, Matrix
 import math
+from array import array
 from math import radians, sin, cos, tan, sqrt
 
 # add more osm tags here.
@@ -72,135 +73,114 @@ osmvals = {'highway': ['traffic_signals']}
 grouplookup = {}
 
 
-def parseBranch(nodes, bm, nmap, obj, scale=100.0, tag=False, UTM=False):
-    vgroups = bm.verts.layers.deform.verify()
+def parseFile(filepath, scale=100.0, tag=False, UTM=False):
+    """
+    Stream the elements of an .osm file, the elements are cleared once read.
+
+    Returns the flat vertex coordinates, the flat edge vertex indices,
+    the vertex indices of the osm key/value groups (by group index),
+    the (name, vertex indices) of the way/node groups and the element count.
+    """
+    from xml.etree import ElementTree
+
+    coords = array('f')
+    edges = array('i')
+    edgekeys = set()
+    metagroups = {}
+    groups = []
+    nmap = {}
     tidx = 0
-    inNode = 0
     dlong = clat = clong = minlat = maxlat = minlong = maxlong = 0.0
     dlat = 1.0  # avoid divide by zero
 
-    for node in nodes:
-        if node.localName == "bounds":
-            if node.hasAttributes():
-                for i in range(node.attributes.length):
-                    at = node.attributes.item(i)
-                    if at.name == "minlat":
-                        minlat = float(at.nodeValue)
-                    elif at.name == "minlon":
-                        minlong = float(at.nodeValue)
-                    elif at.name == "maxlat":
-                        maxlat = float(at.nodeValue)
-                    elif at.name == "maxlon":
-                        maxlong = float(at.nodeValue)
-                dlat = maxlat - minlat
-                dlong = maxlong - minlong
-                clat = (maxlat + minlat) * 0.5
-                clong = (maxlong + minlong) * 0.5
-
-                if UTM:
-                    dlong, dlat = geoToUTM(dlong, dlat)
-                    clong, clat = geoToUTM(clong, clat)
-
-                print(dlat, dlong, clat, clong)
-
-        if node.localName == "way":
-            wayid = node.getAttribute('id')
-            nid = None
-            refs = []
-            if tag:
-                group = obj.vertex_groups.new('way_%s' % wayid)
-                gid = len(obj.vertex_groups) - 1
-            '''
-            if node.hasAttributes():
-                for i in range(node.attributes.length):
-                    at=node.attributes.item(i)
-                    print(at.name)
-            '''
+    parser = iter(ElementTree.iterparse(filepath, events=('start', 'end')))
+    event, root = next(parser)
+    for event, node in parser:
+        if event == 'start':
+            continue
+        tidx += 1
+        if node.tag in {"nd", "tag", "member"}:
+            # read with their parent element
+            continue
+
+        if node.tag == "bounds":
+            minlat = float(node.get('minlat', 0.0))
+            minlong = float(node.get('minlon', 0.0))
+            maxlat = float(node.get('maxlat', 0.0))
+            maxlong = float(node.get('maxlon', 0.0))
+            dlat = maxlat - minlat
+            dlong = maxlong - minlong
+            clat = (maxlat + minlat) * 0.5
+            clong = (maxlong + minlong) * 0.5
+
+            if UTM:
+                dlong, dlat = geoToUTM(dlong, dlat)
+                clong, clat = geoToUTM(clong, clat)
+
+            print(dlat, dlong, clat, clong)
+
+        elif node.tag == "way":
+            # nodes missing from the file break the way
+            refs = [nmap.get(ch.get('ref')) for ch in node if ch.tag == "nd"]
+            for pr, r in zip(refs, refs[1:]):
+                if pr is None or r is None or pr == r:
+                    continue
+                if pr > r:
+                    pr, r = r, pr
+                key = (pr << 32) | r
+                if key not in edgekeys:
+                    edgekeys.add(key)
+                    edges.append(pr)
+                    edges.append(r)
 
             if tag:
-                metagid = []
-                for ch in node.childNodes:
-                    if ch.localName == "tag":
-                        key = ch.getAttribute('k')
+                refs = [r for r in refs if r is not None]
+                groups.append(('way_%s' % node.get('id'), refs))
+                for ch in node:
+                    if ch.tag == "tag":
+                        key = ch.get('k')
                         if key in osmkeys:
-                            metagid.append(grouplookup[key])
-
-            for ch in node.childNodes:
-                if ch.localName == "nd":
-                    for i in range(ch.attributes.length):
-                        at = ch.attributes.item(i)
-                        if at.name == "ref":
-                            vid = int(at.nodeValue)
-                            refs.append(vid)
-                            if tag:
-                                vert = nmap[vid]
-                                weigths = vert[vgroups]
-                                weigths[gid] = 1.0
-                                for mid in metagid:
-                                    weigths[mid] = 1.0
-
-            first = True
-            for r in refs:
-                if first is False:
-                    edge = bm.edges.get((nmap[pr], nmap[r]))
-                    if edge is None:
-                        edge = bm.edges.new((nmap[pr], nmap[r]))
-                    del edge  # don't actually use it
-                else:
-                    first = False
-                pr = r
-
-        if node.localName == "node":
-            if node.hasAttributes():
-                nid = node.getAttribute('id')
-                nlong = node.getAttribute('lon')
-                nlat = node.getAttribute('lat')
-
-                # is this test necessary ? maybe for faulty .osm files
-                if (nid != '') and (nlat != '') and (nlong != ''):
-
-                    if UTM:
-                        nlong, nlat = geoToUTM(float(nlong), float(nlat))
-                    else:
-                        nlat = float(nlat)
-                        nlong = float(nlong)
-
-                    x = (nlong - clong) * scale / dlat
-                    y = (nlat - clat) * scale / dlat
-                    vert = bm.verts.new((x, y, 0.0))
-                    nmap[int(nid)] = vert
-                    if tag:
-                        metagid = []
-                        for ch in node.childNodes:
-                            if ch.localName == "tag":
-                                key = ch.getAttribute('k')
-                                val = ch.getAttribute('v')
-                                if key in osmvals and val in osmvals[key]:
-                                    metagid.append(grouplookup[key])
-                                    metagid.append(grouplookup['_V_' + val])
-                                    weigths = vert[vgroups]
-                                    group = obj.vertex_groups.new('node_%s' % nid)
-                                    gid = len(obj.vertex_groups) - 1
-                                    weigths[gid] = 1.0
-                                    for mid in metagid:
-                                        weigths[mid] = 1.0
-                else:
-                    print('node is missing some elements : %s %s %s' % (nid, nlat, nlong))
+                            metagroups.setdefault(grouplookup[key], []).extend(refs)
 
-        tidx += 1
-        # if tidx > 1000:
-        #     break
-        tidx += parseBranch(node.childNodes, bm, nmap, obj, scale, tag, UTM)
+        elif node.tag == "node":
+            nid = node.get('id', '')
+            nlong = node.get('lon', '')
+            nlat = node.get('lat', '')
 
-    return tidx
+            # is this test necessary ? maybe for faulty .osm files
+            if (nid != '') and (nlat != '') and (nlong != ''):
 
+                if UTM:
+                    nlong, nlat = geoToUTM(float(nlong), float(nlat))
+                else:
+                    nlat = float(nlat)
+                    nlong = float(nlong)
+
+                x = (nlong - clong) * scale / dlat
+                y = (nlat - clat) * scale / dlat
+                vid = len(coords) // 3
+                coords.extend((x, y, 0.0))
+                nmap[nid] = vid
+                if tag:
+                    for ch in node:
+                        if ch.tag == "tag":
+                            key = ch.get('k')
+                            val = ch.get('v')
+                            if key in osmvals and val in osmvals[key]:
+                                metagroups.setdefault(grouplookup[key], []).append(vid)
+                                metagroups.setdefault(grouplookup['_V_' + val], []).append(vid)
+                                groups.append(('node_%s' % nid, [vid]))
+            else:
+                print('node is missing some elements : %s %s %s' % (nid, nlat, nlong))
+
+        # drop the elements read so far, only the current one is kept in memory
+        root.clear()
+
+    return coords, edges, metagroups, groups, tidx
 
-def read(context, filepath, scale=100.0, tag=False, utm=False):
-    import bmesh
-    from xml.dom import minidom
 
+def read(context, filepath, scale=100.0, tag=False, utm=False):
     # create mesh
-    bm = bmesh.new()
     name = bpy.path.display_name_from_filepath(filepath)
     me = bpy.data.meshes.new(name)
     obj = bpy.data.objects.new(name, me)
@@ -209,23 +189,29 @@ def read(context, filepath, scale=100.0, tag=False, utm=False):
     if tag:
         tvid = 0
         for gid, grname in enumerate(osmkeys):
-            obj.vertex_groups.new('_' + grname)
+            obj.vertex_groups.new(name='_' + grname)
             grouplookup[grname] = gid + tvid
             if grname in osmvals:
                 for val in osmvals[grname]:
                     tvid += 1
-                    obj.vertex_groups.new('_V_' + val)
+                    obj.vertex_groups.new(name='_V_' + val)
                     grouplookup['_V_' + val] = gid + tvid
 
-    # get xml then feed bmesh
-    print("Reading xml...")
-    xmldoc = minidom.parse(filepath)
-
+    # stream xml then feed the mesh
     print("Starting parse: %r..." % filepath)
-    nmap = {}
-    tidx = parseBranch(xmldoc.childNodes, bm, nmap, obj, scale, tag, utm)
+    coords, edges, metagroups, groups, tidx = parseFile(filepath, scale, tag, utm)
 
-    bm.to_mesh(me)
+    me.vertices.add(len(coords) // 3)
+    me.vertices.foreach_set("co", coords)
+    me.edges.add(len(edges) // 2)
+    me.edges.foreach_set("vertices", edges)
+    me.update()
+
+    if tag:
+        for gid, verts in metagroups.items():
+            obj.vertex_groups[gid].add(verts, 1.0, 'REPLACE')
+        for grname, verts in groups:
+            obj.vertex_groups.new(name=grname).add(verts, 1.0, 'REPLACE')
 
     # fast approximation of utm for not too big area
     if utm is False:
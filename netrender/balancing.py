@@ -17,6 +17,7 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import time
+import bisect
 
 from netrender.utils import *
 import netrender.model
@@ -29,6 +30,18 @@ class RatingRule:
     def id(self):
         return str(id(self))
 
+    def prepare(self, jobs):
+        """Called on full balance passes before rating, to gather data shared by all jobs"""
+        pass
+
+    def state(self):
+        """Global values the rule depends on, a change forces a full balance pass"""
+        return None
+
+    def jobStatusChanged(self, job, old_status, new_status):
+        """Called on job status changes between full passes, to keep state() up to date without scanning all jobs"""
+        pass
+
     def rate(self, job):
         return 0
 
@@ -39,6 +52,15 @@ class ExclusionRule:
     def id(self):
         return str(id(self))
 
+    def prepare(self, jobs):
+        pass
+
+    def state(self):
+        return None
+
+    def jobStatusChanged(self, job, old_status, new_status):
+        pass
+
     def test(self, job):
         return False
 
@@ -49,6 +71,15 @@ class PriorityRule:
     def id(self):
         return str(id(self))
 
+    def prepare(self, jobs):
+        pass
+
+    def state(self):
+        return None
+
+    def jobStatusChanged(self, job, old_status, new_status):
+        pass
+
     def test(self, job):
         return False
 
@@ -57,6 +88,11 @@ class Balancer:
         self.rules = []
         self.priorities = []
         self.exceptions = []
+        self.keys = {} # sort keys of the last balance pass, by job id
+        self.order = [] # sorted (key, job id), parallel to the balanced jobs list
+        self.dirty = {} # job id: job, sort key needs to be recomputed on the next pass
+        self.state = None
+        self.refresh = True
 
     def ruleByID(self, rule_id):
         for rule in self.rules:
@@ -102,10 +138,91 @@ class Balancer:
                         0 if self.applyPriorities(job) else 1, # priorities first
                         self.applyRules(job))
 
+    def isExcluded(self, job):
+        key = self.keys.get(job.id)
+        if key is None:
+            key = self.sortKey(job)
+
+        return key[0] == 1
+
+    def markDirty(self, job):
+        """Rescore job on the next pass, for changes that only affect its own sort key"""
+        self.dirty[job.id] = job
+
+    def jobStatusChanged(self, job, old_status, new_status):
+        for rule in self.rules + self.priorities + self.exceptions:
+            rule.jobStatusChanged(job, old_status, new_status)
+
+        self.markDirty(job)
+
+    def invalidate(self):
+        """Recompute all sort keys on the next pass, for changes shared by all jobs (usage, rules, job or slave count)"""
+        self.refresh = True
+
+    def ruleState(self):
+        return tuple(rule.state() for rule in self.rules + self.priorities + self.exceptions if rule.enabled)
+
+    def prepare(self, jobs):
+        for rule in self.rules + self.priorities + self.exceptions:
+            if rule.enabled:
+                rule.prepare(jobs)
+
+    def rebalance(self, jobs):
+        # gather per pass data once so each rule is constant time per job
+        self.prepare(jobs)
+        self.keys = {job.id: self.sortKey(job) for job in jobs}
+
+        # use inline copy to make sure the list is still accessible while sorting
+        jobs[:] = sorted(jobs, key=lambda job: (self.keys[job.id], job.id))
+        self.order = [(self.keys[job.id], job.id) for job in jobs]
+
+        self.dirty.clear()
+
+        self.refresh = False
+
+    def update(self, jobs, job):
+        """Move a single job to its new place, jobs must be the list sorted by the last pass"""
+        if job.id not in self.keys:
+            self.rebalance(jobs)
+            return
+
+        index = bisect.bisect_left(self.order, (self.keys[job.id], job.id))
+        if index >= len(jobs) or jobs[index] is not job:
+            # list was changed behind our back
+            self.rebalance(jobs)
+            return
+
+        del self.order[index]
+        del jobs[index]
+
+        key = self.sortKey(job)
+        self.keys[job.id] = key
+
+        index = bisect.bisect_left(self.order, (key, job.id))
+        self.order.insert(index, (key, job.id))
+        jobs.insert(index, job)
+
     def balance(self, jobs):
+        """Sort jobs by dispatch order, returns the first one.
+
+        Only jobs passed to markDirty() are rescored, unless invalidate() was called
+        or a rule's global state changed since the last pass.
+        """
+        state = self.ruleState()
+
+        if self.refresh or state != self.state or len(jobs) != len(self.order):
+            self.rebalance(jobs)
+            self.state = state
+        else:
+            while self.dirty:
+                job_id, job = self.dirty.popitem()
+                if job_id in self.keys:
+                    self.update(jobs, job)
+                else:
+                    # new or removed job, the list changed
+                    self.rebalance(jobs)
+
         if jobs:
-            # use inline copy to make sure the list is still accessible while sorting
-            jobs[:] = sorted(jobs, key=self.sortKey)
             return jobs[0]
         else:
             return None
@@ -132,13 +249,27 @@ class RatingUsageByCategory(RatingRule):
     def __init__(self, get_jobs):
         super().__init__()
         self.getJobs = get_jobs
+        self.category_usage = {}
+        self.category_priority = {}
 
     def __str__(self):
         return "Usage per category"
 
+    def prepare(self, jobs):
+        self.category_usage = {}
+        self.category_priority = {}
+
+        for j in jobs:
+            self.category_usage[j.category] = self.category_usage.get(j.category, 0) + j.usage
+            self.category_priority[j.category] = max(self.category_priority.get(j.category, j.priority), j.priority)
+
     def rate(self, job):
-        total_category_usage = sum([j.usage for j in self.getJobs() if j.category == job.category])
-        maximum_priority = max([j.priority for j in self.getJobs() if j.category == job.category])
+        if job.category in self.category_usage:
+            total_category_usage = self.category_usage[job.category]
+            maximum_priority = self.category_priority[job.category]
+        else: # not prepared for this job
+            total_category_usage = sum([j.usage for j in self.getJobs() if j.category == job.category])
+            maximum_priority = max([j.priority for j in self.getJobs() if j.category == job.category])
 
         # less usage is better
         return total_category_usage / maximum_priority
@@ -233,6 +364,7 @@ class ExcludeSlavesLimit(ExclusionRule):
         self.count_jobs = count_jobs
         self.count_slaves = count_slaves
         self.limit = limit
+        self.queued = None # number of queued jobs, counted on full passes and updated on status changes
 
     def setLimit(self, value):
         self.limit = float(value)
@@ -243,8 +375,28 @@ class ExcludeSlavesLimit(ExclusionRule):
     def __str__(self):
         return "Exclude jobs that would use too many slaves"
 
+    def prepare(self, jobs):
+        self.queued = self.count_jobs()
+
+    def state(self):
+        if self.queued is None:
+            self.queued = self.count_jobs()
+
+        return (self.queued, self.count_slaves(), self.limit)
+
+    def jobStatusChanged(self, job, old_status, new_status):
+        if self.queued is None:
+            return
+
+        if old_status == netrender.model.JOB_QUEUED:
+            self.queued -= 1
+        if new_status == netrender.model.JOB_QUEUED:
+            self.queued += 1
+
     def test(self, job):
-        return not ( self.count_jobs() == 1 or self.count_slaves() <= 1 or float(job.countSlaves() + 1) / self.count_slaves() <= self.limit )
+        count_jobs = self.queued if self.queued is not None else self.count_jobs()
+        count_slaves = self.count_slaves()
+        return not ( count_jobs == 1 or count_slaves <= 1 or float(job.countSlaves() + 1) / count_slaves <= self.limit )
 
     def serialize(self):
         return { "type": "exception",
@@ -255,3 +407,113 @@ class ExcludeSlavesLimit(ExclusionRule):
                  "limit_str":self.str_limit(),
                  "id":self.id()
                 }
+
+def createBalancer(get_jobs, count_jobs, count_slaves):
+    """Balancer with the default master rules"""
+    balancer = Balancer()
+    balancer.addRule(RatingUsageByCategory(get_jobs))
+    balancer.addRule(RatingUsage())
+    balancer.addException(ExcludeQueuedEmptyJob())
+    balancer.addException(ExcludeSlavesLimit(count_jobs, count_slaves, limit = 0.9))
+    balancer.addPriority(NewJobPriority())
+    balancer.addPriority(MinimumTimeBetweenDispatchPriority(limit = 2))
+    return balancer
+
+# ==========================
+
+class BenchmarkJob:
+    """Stand-in for a master job with constant time frame counters"""
+    def __init__(self, job_id, category, priority, frames_status, slaves, usage, last_dispatched):
+        self.id = job_id
+        self.category = category
+        self.priority = priority
+        self.status = netrender.model.JOB_QUEUED
+        self.frames_status = frames_status
+        self.slaves = slaves
+        self.usage = usage
+        self.last_dispatched = last_dispatched
+
+    def countFrames(self, status=netrender.model.FRAME_QUEUED):
+        return self.frames_status[status]
+
+    def countSlaves(self):
+        return self.slaves
+
+def benchmark(job_count = 5000, slave_count = 200, category_count = 20, passes = 20, seed = 0):
+    """Balance a synthetic job population, returns the average time in seconds of
+    a full balance pass and of a pass after a single dispatch.
+
+    Between full passes usage is changed the same way the master does it (decay plus
+    a share per slave), dispatch passes change the frame counters of one job.
+    """
+    import random
+    rng = random.Random(seed)
+
+    now = time.time()
+    jobs = []
+    for i in range(job_count):
+        queued = rng.randint(0, 1000)
+        dispatched = rng.randint(0, 4)
+        frames_status = {
+            netrender.model.FRAME_QUEUED: queued,
+            netrender.model.FRAME_DISPATCHED: dispatched,
+            netrender.model.FRAME_DONE: rng.randint(0, 1000),
+            netrender.model.FRAME_ERROR: 0,
+            }
+        jobs.append(BenchmarkJob(
+            str(i + 1),
+            "category_%i" % rng.randrange(category_count),
+            rng.randint(1, 10),
+            frames_status,
+            dispatched,
+            rng.random(),
+            now - rng.randint(0, 600),
+            ))
+
+    # count queued jobs like the master does
+    def count_jobs(status = netrender.model.JOB_QUEUED):
+        total = 0
+        for job in jobs:
+            if job.status == status:
+                total += 1
+
+        return total
+
+    balancer = createBalancer(lambda: jobs, count_jobs, lambda: slave_count)
+
+    total_full = 0.0
+    total_dispatch = 0.0
+    for i in range(passes):
+        for job in jobs:
+            job.usage *= 0.5
+        for job in rng.sample(jobs, min(slave_count, len(jobs))):
+            job.usage += 0.5 / slave_count
+        balancer.invalidate()
+
+        t = time.perf_counter()
+        balancer.balance(jobs)
+        total_full += time.perf_counter() - t
+
+        job = balancer.balance(jobs)
+        if job:
+            job.frames_status[netrender.model.FRAME_QUEUED] = max(job.frames_status[netrender.model.FRAME_QUEUED] - 1, 0)
+            job.frames_status[netrender.model.FRAME_DISPATCHED] += 1
+            job.last_dispatched = time.time()
+            balancer.markDirty(job)
+
+        t = time.perf_counter()
+        balancer.balance(jobs)
+        total_dispatch += time.perf_counter() - t
+
+    return total_full / passes, total_dispatch / passes
+
+if __name__ == "__main__":
+    import sys
+    try:
+        start = sys.argv.index("--") + 1
+    except ValueError:
+        start = 1
+
+    for job_count in ([int(arg) for arg in sys.argv[start:]] or [100, 1000, 5000]):
+        full, dispatch = benchmark(job_count)
+        print("%6i jobs: %8.3f ms full pass, %8.3f ms after dispatch" % (job_count, full * 1000, dispatch * 1000))
@@ -236,14 +236,17 @@ def sendJobBaking(conn, scene, can_save = True):
     with ConnectionContext():
         conn.request("POST", "/job", json.dumps(job.serialize()))
     response = conn.getresponse()
-    response.read()
+    missing = response.read()
 
     job_id = response.getheader("job-id")
 
     # if not ACCEPTED (but not processed), send files
     if response.status == http.client.ACCEPTED:
+        # master lists the files it doesn't have yet, older masters need all of them
+        missing = set(json.loads(str(missing, encoding='utf8'))) if missing else None
         for rfile in job.files:
-            sendFile(conn, fileURL(job_id, rfile.index), rfile.filepath)
+            if missing is None or rfile.index in missing:
+                sendFile(conn, fileURL(job_id, rfile.index), rfile.filepath)
             # server will reply with ACCEPTED until all files are found
 
     return job_id
@@ -320,14 +323,17 @@ def sendJobBlender(conn, scene, anim = False, can_save = True):
     with ConnectionContext():
         conn.request("POST", "/job", json.dumps(job.serialize()))
     response = conn.getresponse()
-    response.read()
+    missing = response.read()
 
     job_id = response.getheader("job-id")
 
     # if not ACCEPTED (but not processed), send files
     if response.status == http.client.ACCEPTED:
+        # master lists the files it doesn't have yet, older masters need all of them
+        missing = set(json.loads(str(missing, encoding='utf8'))) if missing else None
         for rfile in job.files:
-            sendFile(conn, fileURL(job_id, rfile.index), rfile.filepath)
+            if missing is None or rfile.index in missing:
+                sendFile(conn, fileURL(job_id, rfile.index), rfile.filepath)
             # server will reply with ACCEPTED until all files are found
 
     return job_id
@@ -368,7 +374,9 @@ class NetworkRenderEngine(bpy.types.RenderEngine):
                          test_break = self.test_break,
                          use_ssl=netsettings.use_ssl,
                          cert_path=netsettings.cert_path,
-                         key_path=netsettings.key_path)
+                         key_path=netsettings.key_path,
+                         threaded=netsettings.use_master_threaded,
+                         cache_size=netsettings.cache_size * 1024 * 1024)
 
 
     def render_slave(self, scene):
@@ -424,7 +432,7 @@ class NetworkRenderEngine(bpy.types.RenderEngine):
                 netsettings.job_id = 0
 
             if response.status != http.client.OK:
-                conn.close()
+                releaseConnection(conn)
                 return
 
             r = scene.render
@@ -446,7 +454,7 @@ class NetworkRenderEngine(bpy.types.RenderEngine):
             result.load_from_file(result_path)
             self.end_result(result)
 
-            conn.close()
+            releaseConnection(conn)
 
 def compatible(module):
     module = __import__("bl_ui." + module)
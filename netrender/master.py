@@ -19,10 +19,13 @@
 import sys, os
 import http, http.client, http.server, socket, socketserver
 import shutil, time, hashlib
+import heapq
 import pickle
 import zipfile
 import select # for select.error
 import json
+import threading
+import urllib.parse
 
 
 from netrender.utils import *
@@ -36,11 +39,12 @@ class MRenderFile(netrender.model.RenderFile):
         super().__init__(filepath, index, start, end, signature)
         self.found = False
 
-    def updateStatus(self):
+    def updateStatus(self, found_signature = None):
         self.found = os.path.exists(self.filepath)
 
         if self.found and self.signature is not None:
-            found_signature = hashFile(self.filepath)
+            if found_signature is None:
+                found_signature = hashFile(self.filepath)
             self.found = self.signature == found_signature
             if not self.found:
                 print("Signature mismatch", self.signature, found_signature)
@@ -81,6 +85,8 @@ class MRenderSlave(netrender.model.RenderSlave):
 
 class MRenderJob(netrender.model.RenderJob):
     def __init__(self, job_id, job_info):
+        self.journal = None # set when added to the server
+        self.balancer = None # set when added to the server
         super().__init__(job_info)
         self.id = job_id
         self.last_dispatched = time.time()
@@ -98,6 +104,111 @@ class MRenderJob(netrender.model.RenderJob):
         self.save_path = ""
         self.files = [MRenderFile(rfile.filepath, rfile.index, rfile.start, rfile.end, rfile.signature) for rfile in job_info.files]
 
+        self.rebuildIndex()
+        self.archived = set() # new job, nothing archived yet
+
+    @netrender.model.RenderJob.status.setter
+    def status(self, value):
+        old_status = self.status
+        netrender.model.RenderJob.status.fset(self, value)
+
+        if self.balancer:
+            self.balancer.jobStatusChanged(self, old_status, value)
+
+        if self.journal:
+            self.journal.jobStatus(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["journal"] = None
+        state["balancer"] = None
+        state["archive_lock"] = None
+        return state
+
+    def serializeState(self):
+        """Serialize with the master only data, to restore from the journal"""
+        data = self.serialize()
+        data["save_path"] = self.save_path
+        data["found"] = [rfile.found for rfile in self.files]
+        data["log_paths"] = {str(frame.number): frame.log_path for frame in self.frames if frame.log_path}
+        return data
+
+    @staticmethod
+    def materializeState(data, slaves_map):
+        job_info = netrender.model.RenderJob.materialize(data)
+
+        job = MRenderJob(data["id"], job_info)
+        job.status = data["status"]
+        job.transitions = data["transitions"]
+        job.usage = data["usage"]
+        job.last_dispatched = data["last_dispatched"]
+        job.resolution = data["resolution"]
+        job.save_path = data["save_path"]
+        job.archived = None # rebuild the archive from the restored frames
+
+        for rfile, info_file, found in zip(job.files, job_info.files, data["found"]):
+            rfile.original_path = info_file.original_path
+            rfile.found = found
+
+        for info_frame in job_info.frames:
+            frame = job.addFrame(info_frame.number, info_frame.command)
+            frame.time = info_frame.time
+            frame.results = info_frame.results
+            frame.log_path = data["log_paths"].get(str(info_frame.number))
+            frame.slave = slaves_map.get(info_frame.slave.id) if info_frame.slave else None
+            frame.status = info_frame.status
+
+        return job
+
+    def rebuildIndex(self):
+        """(Re)create the frame lookup, status counters and queued frames heap, used after restoring older saves"""
+        self.frames_map = {}
+        self.frames_status = {status: 0 for status in netrender.model.FRAME_STATUS_TEXT}
+        self.queued_frames = [] # heap of queued frame numbers, can contain stale entries that are skipped on pop
+        self.dispatched_slaves = {} # slave id: number of frames dispatched to it
+        self.markDirty()
+
+        # results.zip is kept up to date as frames finish
+        self.archive_lock = threading.Lock()
+        self.archived = None # names in the archive, None when unknown and the archive has to be rebuilt
+        self.archive_readers = 0 # downloads of results.zip in progress, appends go to a copy meanwhile
+
+        for frame in self.frames:
+            frame.job = self
+            self.frames_map[frame.number] = frame
+            self.frameStatusChanged(frame, None, frame.status)
+
+    def markDirty(self):
+        """Sort key needs to be recomputed by the balancer"""
+        if self.balancer:
+            self.balancer.markDirty(self)
+
+    def frameStatusChanged(self, frame, old_status, new_status):
+        self.markDirty()
+
+        if self.journal:
+            self.journal.frame(self, frame)
+
+        if old_status is not None:
+            self.frames_status[old_status] -= 1
+
+        self.frames_status[new_status] += 1
+
+        if new_status == netrender.model.FRAME_QUEUED:
+            heapq.heappush(self.queued_frames, frame.number)
+
+        # frame.slave is set while the frame is dispatched
+        slave_id = frame.slave.id if frame.slave else None
+        if old_status == netrender.model.FRAME_DISPATCHED:
+            count = self.dispatched_slaves.get(slave_id, 0) - 1
+            if count > 0:
+                self.dispatched_slaves[slave_id] = count
+            else:
+                self.dispatched_slaves.pop(slave_id, None)
+
+        if new_status == netrender.model.FRAME_DISPATCHED:
+            self.dispatched_slaves[slave_id] = self.dispatched_slaves.get(slave_id, 0) + 1
+
     def setForceUpload(self, force):
         for rfile in self.files:
             rfile.force = force
@@ -122,14 +233,48 @@ class MRenderJob(netrender.model.RenderJob):
         if "chunks" in info_map:
             self.chunks = info_map["chunks"]
 
-    def testStart(self):
+        self.markDirty()
+
+        if self.journal:
+            self.journal.jobStatus(self)
+
+    def localFilePath(self, rfile):
+        """Path of a dependency file inside the job directory"""
+        main_file = self.files[0].original_path # original path of the first file
+
+        main_path, main_name = os.path.split(main_file)
+
+        if rfile.index > 0:
+            return createLocalPath(rfile, self.save_path, main_path, True)
+        else:
+            return os.path.join(self.save_path, main_name)
+
+    def testCache(self, file_cache):
+        """Link missing files already known to the dependency cache into the job directory"""
+        for rfile in self.files:
+            if not rfile.force and not rfile.found and rfile.signature in file_cache:
+                file_path = self.localFilePath(rfile)
+                if file_cache.link(rfile.signature, file_path):
+                    rfile.filepath = file_path
+                    rfile.updateStatus(rfile.signature)
+
+                    if self.journal:
+                        self.journal.jobFile(self, rfile)
+
+    def missingFiles(self):
+        return [rfile.index for rfile in self.files if not rfile.found]
+
+    def testFiles(self, file_cache = None):
+        """Check all files are there to start the job, start() is left to the caller so it can be done under the server lock"""
         # Don't test files for versioned jobs
         if not self.version_info:
+            if file_cache:
+                self.testCache(file_cache)
+
             for f in self.files:
                 if not f.test():
                     return False
 
-        self.start()
         self.initInfo()
         return True
 
@@ -169,8 +314,28 @@ class MRenderJob(netrender.model.RenderJob):
     def addFrame(self, frame_number, command):
         frame = MRenderFrame(frame_number, command)
         self.frames.append(frame)
+
+        frame.job = self
+        self.frames_map[frame_number] = frame
+        self.frameStatusChanged(frame, None, frame.status)
+
         return frame
 
+    def countFrames(self, status=netrender.model.FRAME_QUEUED):
+        return self.frames_status[status]
+
+    def framesStatus(self):
+        return dict(self.frames_status)
+
+    def countSlaves(self):
+        return len(self.dispatched_slaves)
+
+    def __contains__(self, frame_number):
+        return frame_number in self.frames_map
+
+    def __getitem__(self, frame_number):
+        return self.frames_map.get(frame_number)
+
     def reset(self, all):
         for f in self.frames:
             f.reset(all)
@@ -179,21 +344,100 @@ class MRenderJob(netrender.model.RenderJob):
             self.status = netrender.model.JOB_QUEUED
 
     def getFrames(self):
+        """Pop the next chunk of queued frames, lowest frame numbers first.
+
+        The returned frames are expected to be dispatched, they are queued again by
+        setting their status back to FRAME_QUEUED.
+        """
         frames = []
-        for f in self.frames:
-            if f.status == netrender.model.FRAME_QUEUED:
-                self.last_dispatched = time.time()
+        while self.queued_frames and len(frames) < max(self.chunks, 1):
+            f = self.frames_map.get(heapq.heappop(self.queued_frames))
+
+            # skip stale entries for frames that changed status or were pushed twice
+            if f and f.status == netrender.model.FRAME_QUEUED and f not in frames:
                 frames.append(f)
-                if len(frames) >= self.chunks:
-                    break
+
+        if frames:
+            self.last_dispatched = time.time()
 
         return frames
 
     def getResultPath(self, filename):
         return os.path.join(self.save_path, filename)
 
+    def archiveFrame(self, frame):
+        """Append the results of a finished frame to results.zip"""
+        with self.archive_lock:
+            if self.archived is None:
+                return # rebuilt on next request
+
+            if any(filename in self.archived for filename in frame.results):
+                # rendered again, can't replace entries in a zip
+                self.archived = None
+                return
+
+            zip_filepath = self.getResultPath("results.zip")
+
+            # appending rewrites the end of the file, don't change it under a download
+            if self.archive_readers:
+                archive_filepath = zip_filepath + ".tmp"
+            else:
+                archive_filepath = zip_filepath
+
+            try:
+                if archive_filepath != zip_filepath:
+                    shutil.copyfile(zip_filepath, archive_filepath)
+
+                with zipfile.ZipFile(archive_filepath, "a", zipfile.ZIP_STORED) as zfile:
+                    for filename in frame.results:
+                        zfile.write(self.getResultPath(filename), filename)
+                        self.archived.add(filename)
+
+                if archive_filepath != zip_filepath:
+                    os.replace(archive_filepath, zip_filepath)
+            except (OSError, zipfile.BadZipFile) as err:
+                print("Couldn't add results to archive", err)
+                self.archived = None
+
+    def writeArchive(self, fileobj, frames):
+        # EXR and PNG results are already compressed, store them as is
+        with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_STORED) as zfile:
+            for frame in frames:
+                if frame.status == netrender.model.FRAME_DONE:
+                    for filename in frame.results:
+                        zfile.write(self.getResultPath(filename), filename)
+
+    def updateArchive(self):
+        """Make sure results.zip contains all done frames, must be called with archive_lock"""
+        zip_filepath = self.getResultPath("results.zip")
+
+        if self.archived is None:
+            frames = [frame for frame in self.frames if frame.status == netrender.model.FRAME_DONE]
+            # written next to it and swapped in, downloads in progress keep reading the previous one
+            self.writeArchive(zip_filepath + ".tmp", frames)
+            os.replace(zip_filepath + ".tmp", zip_filepath)
+            self.archived = set(filename for frame in frames for filename in frame.results)
+
+        return zip_filepath
+
+    def openArchive(self):
+        """Up to date results.zip opened for reading, call closeArchive once sent"""
+        with self.archive_lock:
+            f = open(self.updateArchive(), 'rb')
+            self.archive_readers += 1
+
+        return f
+
+    def closeArchive(self, f):
+        with self.archive_lock:
+            self.archive_readers -= 1
+
+        f.close()
+
 class MRenderFrame(netrender.model.RenderFrame):
     def __init__(self, frame, command):
+        self.job = None # owning job, notified of status changes
+        self._status = netrender.model.FRAME_QUEUED
         super().__init__()
         self.number = frame
         self.slave = None
@@ -203,6 +447,25 @@ class MRenderFrame(netrender.model.RenderFrame):
 
         self.log_path = None
 
+    def __setstate__(self, state):
+        # saves from before the job index stored the status directly
+        if "status" in state:
+            state["_status"] = state.pop("status")
+        state.setdefault("job", None)
+        self.__dict__.update(state)
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        old_status = self._status
+        self._status = value
+
+        if self.job and old_status != value:
+            self.job.frameStatusChanged(self, old_status, value)
+
     def addDefaultRenderResult(self):
         self.results.append(self.getRenderFilename())
 
@@ -211,10 +474,101 @@ class MRenderFrame(netrender.model.RenderFrame):
 
     def reset(self, all):
         if all or self.status == netrender.model.FRAME_ERROR:
+            # change status before clearing the slave, the job tracks dispatched slaves
+            self.status = netrender.model.FRAME_QUEUED
             self.log_path = None
             self.slave = None
             self.time = 0
-            self.status = netrender.model.FRAME_QUEUED
+
+
+class MasterJournal:
+    """Append-only log of job, frame and slave changes, one JSON object per line.
+
+    Replaying it restores the master after a crash. It's compacted into one entry
+    per job and slave once it grows past compact_limit entries.
+    """
+    def __init__(self, filepath, compact_limit = 10000):
+        self.filepath = filepath
+        self.compact_limit = compact_limit
+        self.count = 0
+        self.lock = threading.Lock()
+        self.file = open(self.filepath, "a", encoding="utf8")
+
+    @staticmethod
+    def read(filepath):
+        entries = []
+        with open(filepath, "r", encoding="utf8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # last line can be incomplete after a crash
+                    print("Ignoring invalid journal entry:", line)
+        return entries
+
+    def write(self, entry):
+        with self.lock:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+            self.count += 1
+
+    def job(self, job):
+        self.write({"type": "job", "job": job.serializeState()})
+
+    def jobStatus(self, job):
+        self.write({"type": "job_status", "id": job.id, "status": job.status, "priority": job.priority, "chunks": job.chunks, "resolution": job.resolution})
+
+    def removeJob(self, job):
+        self.write({"type": "job_remove", "id": job.id})
+
+    def frame(self, job, frame):
+        self.write({
+                    "type": "frame",
+                    "id": job.id,
+                    "number": frame.number,
+                    "status": frame.status,
+                    "time": frame.time,
+                    "slave": frame.slave.id if frame.slave else None,
+                    "results": frame.results,
+                    "log_path": frame.log_path
+                    })
+
+    def jobFile(self, job, rfile):
+        self.write({"type": "file", "id": job.id, "index": rfile.index, "filepath": rfile.filepath, "found": rfile.found})
+
+    def jobBlacklist(self, job):
+        self.write({"type": "blacklist", "id": job.id, "blacklist": job.blacklist})
+
+    def slave(self, slave):
+        self.write({"type": "slave", "slave": slave.serialize()})
+
+    def removeSlave(self, slave):
+        self.write({"type": "slave_remove", "id": slave.id})
+
+    def needsCompaction(self):
+        return self.count > self.compact_limit
+
+    def compact(self, httpd):
+        """Replace the journal by the current state of the server"""
+        temp_path = self.filepath + ".tmp"
+
+        # entries written between the snapshot and the replace would be lost, hold the lock across both
+        with self.lock:
+            with open(temp_path, "w", encoding="utf8") as f:
+                f.write(json.dumps({"type": "master", "path": httpd.path, "job_id": httpd.job_id}) + "\n")
+                for slave in httpd.slaves:
+                    f.write(json.dumps({"type": "slave", "slave": slave.serialize()}) + "\n")
+                for job in httpd.jobs:
+                    f.write(json.dumps({"type": "job", "job": job.serializeState()}) + "\n")
+
+            self.file.close()
+            os.replace(temp_path, self.filepath)
+            self.file = open(self.filepath, "a", encoding="utf8")
+            self.count = 0
+
+    def close(self):
+        with self.lock:
+            self.file.close()
 
 
 # -=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=
@@ -230,15 +584,85 @@ reset_pattern = re.compile("/reset(all|)_([a-zA-Z0-9]+)_([0-9]+)")
 cancel_pattern = re.compile("/cancel_([a-zA-Z0-9]+)")
 pause_pattern = re.compile("/pause_([a-zA-Z0-9]+)")
 edit_pattern = re.compile("/edit_([a-zA-Z0-9]+)")
+range_pattern = re.compile("bytes=([0-9]+)-$")
 
 class RenderHandler(http.server.BaseHTTPRequestHandler):
-    def write_file(self, file_path, mode = 'wb'):
-        length = int(self.headers['content-length'])
-        f = open(file_path, mode)
-        buf = self.rfile.read(length)
-        f.write(buf)
-        f.close()
-        del buf
+    # keep connections open between requests, slaves and clients poll a lot
+    protocol_version = "HTTP/1.1"
+    # drop idle keep-alive connections after that many seconds
+    timeout = KEEP_ALIVE_TIMEOUT
+    # request body bytes not read yet
+    body_left = 0
+    response_sent = False
+
+    def parse_request(self):
+        self.body_left = 0
+        self.response_sent = False
+
+        if not super().parse_request():
+            return False
+
+        self.body_left = int(self.headers.get('content-length', 0))
+        self.server.countRequest()
+        return True
+
+    def handle_one_request(self):
+        super().handle_one_request()
+
+        # the client would wait forever on a request left without an answer
+        if not self.response_sent:
+            self.close_connection = True
+
+        # the next request on this connection starts after the body, skip what wasn't read
+        if self.body_left and not self.close_connection:
+            if self.body_left > KEEP_ALIVE_DRAIN_SIZE or not copyChunks(self.rfile, DiscardFile(), self.body_left):
+                self.close_connection = True
+            self.body_left = 0
+
+    def read_body(self):
+        length = self.body_left
+        self.body_left = 0
+        return self.rfile.read(length)
+
+    def write_file(self, file_path, mode = 'wb', offset = 0):
+        """Stream the request body to file_path, returns its signature (None if incomplete or appending)"""
+        length = self.body_left
+        self.body_left = 0
+        return streamToFile(self.rfile, file_path, length, offset, mode)
+
+    def send_file(self, file_path, content = "application/octet-stream"):
+        """Send a file in chunks, supports resuming with a Range header (bytes=offset-)"""
+        with open(file_path, 'rb') as f:
+            self.send_fileobj(f, content)
+
+    def send_fileobj(self, f, content = "application/octet-stream"):
+        """Send an open file from its start, see send_file"""
+        size = os.fstat(f.fileno()).st_size
+        offset = 0
+
+        match = range_pattern.match(self.headers.get('range', ""))
+        if match:
+            offset = int(match.groups()[0])
+
+        if 0 < offset < size:
+            f.seek(offset)
+            self.send_head(http.client.PARTIAL_CONTENT, headers = {"content-range": "bytes %i-%i/%i" % (offset, size - 1, size)}, content = None, length = size - offset)
+        else:
+            self.send_head(content = content, length = size)
+
+        copyChunks(f, self.wfile)
+
+    def send_data(self, data, code = http.client.OK, headers = {}, content = "application/octet-stream"):
+        """Send a response with data (bytes or str) as body"""
+        if isinstance(data, str):
+            data = bytes(data, encoding='utf8')
+
+        self.send_head(code, headers, content, len(data))
+        self.wfile.write(data)
+
+    def send_thumb_pending(self):
+        """Answer ACCEPTED with the placeholder image, so the web interface shows it until the thumbnail is ready"""
+        self.send_data(self.server.thumbnail_placeholder, http.client.ACCEPTED, headers = {"Content-type": "image/jpeg"}, content = None)
 
     def log_message(self, format, *args):
         # override because the original calls self.address_string(), which
@@ -246,20 +670,26 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
         sys.stderr.write("[%s] %s\n" % (self.log_date_time_string(), format%args))
 
     def getInfoMap(self):
-        length = int(self.headers['content-length'])
-
-        if length > 0:
-            msg = str(self.rfile.read(length), encoding='utf8')
+        if self.body_left > 0:
+            msg = str(self.read_body(), encoding='utf8')
             return json.loads(msg)
         else:
             return {}
 
-    def send_head(self, code = http.client.OK, headers = {}, content = "application/octet-stream"):
+    def send_head(self, code = http.client.OK, headers = {}, content = "application/octet-stream", length = 0):
+        """length is the size of the body that follows, None if unknown (the connection is closed after it)"""
         self.send_response(code)
+        self.response_sent = True
 
         if code == http.client.OK and content:
             self.send_header("Content-type", content)
 
+        if length is None:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        elif code >= http.client.OK and code != http.client.NO_CONTENT:
+            self.send_header("Content-Length", str(length))
+
         for key, value in headers.items():
             self.send_header(key, value)
 
@@ -294,9 +724,8 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
     def do_GET(self):
 
         if self.path == "/version":
-            self.send_head()
             self.server.stats("", "Version check")
-            self.wfile.write(VERSION)
+            self.send_data(VERSION)
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path.startswith("/render"):
             match = render_pattern.match(self.path)
@@ -318,10 +747,7 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
                             filename = job.getResultPath(frame.getRenderFilename())
 
-                            f = open(filename, 'rb')
-                            self.send_head(content = "image/x-exr")
-                            shutil.copyfileobj(f, self.wfile)
-                            f.close()
+                            self.send_file(filename, content = "image/x-exr")
                         elif frame.status == netrender.model.FRAME_ERROR:
                             self.send_head(http.client.PARTIAL_CONTENT)
                     else:
@@ -345,20 +771,27 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 if job:
                     self.server.stats("", "Sending result to client")
 
-                    zip_filepath = job.getResultPath("results.zip")
-                    with zipfile.ZipFile(zip_filepath, "w") as zfile:
-                        for frame in job.frames:
-                            if frame.status == netrender.model.FRAME_DONE:
-                                for filename in frame.results:
-                                    filepath = job.getResultPath(filename)
+                    query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
 
-                                    zfile.write(filepath, filename)
+                    if "frames" in query:
+                        # subset of the frames, zipped straight to the socket
+                        try:
+                            ranges = parseFrameRanges(query["frames"][0])
+                        except ValueError:
+                            self.send_head(http.client.BAD_REQUEST)
+                            return
 
+                        frames = [f for f in job.frames if any(s <= f.number <= e for s, e in ranges)]
 
-                    f = open(zip_filepath, 'rb')
-                    self.send_head(content = "application/x-zip-compressed")
-                    shutil.copyfileobj(f, self.wfile)
-                    f.close()
+                        self.send_head(content = "application/x-zip-compressed", length = None)
+                        job.writeArchive(self.wfile, frames)
+                    else:
+                        # only held while the archive is opened, slaves keep adding results during the download
+                        f = job.openArchive()
+                        try:
+                            self.send_fileobj(f, content = "application/x-zip-compressed")
+                        finally:
+                            job.closeArchive(f)
                 else:
                     # no such job id
                     self.send_head(http.client.NO_CONTENT)
@@ -380,20 +813,19 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
                     if frame:
                         if frame.status in {netrender.model.FRAME_QUEUED, netrender.model.FRAME_DISPATCHED}:
-                            self.send_head(http.client.ACCEPTED)
+                            self.send_thumb_pending()
                         elif frame.status == netrender.model.FRAME_DONE:
                             filename = job.getResultPath(frame.getRenderFilename())
 
-                            thumbname = thumbnail.generate(filename)
+                            thumbname = self.server.thumbnails.request(filename)
 
                             if thumbname:
-                                f = open(thumbname, 'rb')
-                                self.send_head(content = "image/jpeg")
-                                shutil.copyfileobj(f, self.wfile)
-                                f.close()
-                            else: # thumbnail couldn't be generated
+                                self.send_file(thumbname, content = "image/jpeg")
+                            elif self.server.thumbnails.hasFailed(filename): # thumbnail couldn't be generated
                                 self.send_head(http.client.PARTIAL_CONTENT)
                                 return
+                            else: # still being generated
+                                self.send_thumb_pending()
                         elif frame.status == netrender.model.FRAME_ERROR:
                             self.send_head(http.client.PARTIAL_CONTENT)
                     else:
@@ -423,13 +855,7 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                             self.send_head(http.client.PROCESSING)
                         else:
                             self.server.stats("", "Sending log to client")
-                            f = open(frame.log_path, 'rb')
-
-                            self.send_head(content = "text/plain")
-
-                            shutil.copyfileobj(f, self.wfile)
-
-                            f.close()
+                            self.send_file(frame.log_path, content = "text/plain")
                     else:
                         # no such frame
                         self.send_head(http.client.NO_CONTENT)
@@ -471,40 +897,40 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
 
             self.server.stats("", "Sending status")
-            self.send_head()
-            self.wfile.write(bytes(json.dumps(message), encoding='utf8'))
+            self.send_data(json.dumps(message))
 
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path == "/job":
-            self.server.balance()
-
             slave_id = self.headers['slave-id']
 
             slave = self.server.getSeenSlave(slave_id)
 
             if slave: # only if slave id is valid
-                job, frames = self.server.newDispatch(slave)
+                # balance, pick and mark frames atomically so concurrent slaves never get the same frames
+                with self.server.lock:
+                    self.server.balance()
+                    job, frames = self.server.newDispatch(slave)
 
-                if job and frames:
-                    for f in frames:
-                        print("dispatch", f.number)
-                        f.status = netrender.model.FRAME_DISPATCHED
-                        f.slave = slave
+                    if job and frames:
+                        for f in frames:
+                            print("dispatch", f.number)
+                            f.slave = slave
+                            f.status = netrender.model.FRAME_DISPATCHED
 
-                    slave.job = job
-                    slave.job_frames = [f.number for f in frames]
+                        slave.job = job
+                        slave.job_frames = [f.number for f in frames]
 
-                    self.send_head(headers={"job-id": job.id})
+                        message = job.serialize(frames)
+                    else:
+                        slave.job = None
+                        slave.job_frames = []
 
-                    message = job.serialize(frames)
-                    self.wfile.write(bytes(json.dumps(message), encoding='utf8'))
+                if job and frames:
+                    self.send_data(json.dumps(message), headers={"job-id": job.id})
 
                     self.server.stats("", "Sending job to slave")
                 else:
                     # no job available, return error code
-                    slave.job = None
-                    slave.job_frames = []
-
                     self.send_head(http.client.ACCEPTED)
             else: # invalid slave id
                 self.send_head(http.client.NO_CONTENT)
@@ -530,12 +956,7 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
                     if render_file:
                         self.server.stats("", "Sending file to slave")
-                        f = open(render_file.filepath, 'rb')
-
-                        self.send_head()
-                        shutil.copyfileobj(f, self.wfile)
-
-                        f.close()
+                        self.send_file(render_file.filepath)
                     else:
                         # no such file
                         self.send_head(http.client.NO_CONTENT)
@@ -553,9 +974,7 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
             for slave in self.server.slaves:
                 message.append(slave.serialize())
 
-            self.send_head()
-
-            self.wfile.write(bytes(json.dumps(message), encoding='utf8'))
+            self.send_data(json.dumps(message))
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         else:
             # hand over the rest to the html section
@@ -571,9 +990,7 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         if self.path == "/job":
 
-            length = int(self.headers['content-length'])
-
-            job_info = netrender.model.RenderJob.materialize(json.loads(str(self.rfile.read(length), encoding='utf8')))
+            job_info = netrender.model.RenderJob.materialize(json.loads(str(self.read_body(), encoding='utf8')))
             job_id = self.server.nextJobID()
 
             job = MRenderJob(job_id, job_info)
@@ -587,12 +1004,16 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
             headers={"job-id": job_id}
 
-            if job.testStart():
+            if job.testFiles(self.server.file_cache):
+                with self.server.lock:
+                    job.start()
+
                 self.server.stats("", "New job, started")
                 self.send_head(headers=headers, content = None)
             else:
+                # tell the client which files it needs to upload
                 self.server.stats("", "New job, missing files (%i total)" % len(job.files))
-                self.send_head(http.client.ACCEPTED, headers=headers)
+                self.send_data(json.dumps(job.missingFiles()), http.client.ACCEPTED, headers)
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path.startswith("/edit"):
             match = edit_pattern.match(self.path)
@@ -605,7 +1026,11 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 if job:
                     info_map = self.getInfoMap()
 
-                    job.edit(info_map)
+                    with self.server.lock:
+                        job.edit(info_map)
+
+                    # priority is shared by all jobs of the category
+                    self.server.balancer.invalidate()
                     self.send_head(content = None)
                 else:
                     # no such job id
@@ -624,6 +1049,8 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 except:
                     pass # invalid type
 
+            self.server.balancer.invalidate()
+
             self.send_head(content = None)
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path == "/balance_enable":
@@ -633,6 +1060,8 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 if rule:
                     rule.enabled = enabled
 
+            self.server.balancer.invalidate()
+
             self.send_head(content = None)
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path.startswith("/cancel"):
@@ -670,7 +1099,8 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
                 if job:
                     self.server.stats("", "Pausing job")
-                    job.pause(status)
+                    with self.server.lock:
+                        job.pause(status)
                     self.send_head(content = None)
                 else:
                     # no such job id
@@ -705,7 +1135,8 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                         frame = job[job_frame]
                         if frame:
                             self.server.stats("", "Reset job frame")
-                            frame.reset(all)
+                            with self.server.lock:
+                                frame.reset(all)
                             self.send_head(content = None)
                         else:
                             # no such frame
@@ -713,7 +1144,8 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
 
                     else:
                         self.server.stats("", "Reset job")
-                        job.reset(all)
+                        with self.server.lock:
+                            job.reset(all)
                         self.send_head(content = None)
 
                 else: # job not found
@@ -722,12 +1154,11 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 self.send_head(http.client.NO_CONTENT)
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path == "/slave":
-            length = int(self.headers['content-length'])
             # job_frame_string = self.headers['job-frame']  # UNUSED
 
             self.server.stats("", "New slave connected")
 
-            slave_info = netrender.model.RenderSlave.materialize(json.loads(str(self.rfile.read(length), encoding='utf8')), cache = False)
+            slave_info = netrender.model.RenderSlave.materialize(json.loads(str(self.read_body(), encoding='utf8')), cache = False)
 
             slave_info.address = self.client_address
 
@@ -736,9 +1167,7 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
             self.send_head(headers = {"slave-id": slave_id}, content = None)
         # =-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
         elif self.path == "/log":
-            length = int(self.headers['content-length'])
-
-            log_info = netrender.model.LogFile.materialize(json.loads(str(self.rfile.read(length), encoding='utf8')))
+            log_info = netrender.model.LogFile.materialize(json.loads(str(self.read_body(), encoding='utf8')))
 
             slave_id = log_info.slave_id
 
@@ -780,26 +1209,39 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                     rfile = job.files[file_index]
 
                     if rfile:
-                        main_file = job.files[0].original_path # original path of the first file
+                        file_path = job.localFilePath(rfile)
+
+                        # resume an interrupted upload if the client says where it restarts,
+                        # without the header it's a fresh upload and a leftover partial file is replaced
+                        offset = int(self.headers.get('upload-offset', 0))
+                        if offset and offset != partialSize(file_path):
+                            self.server.stats("", "File upload, can't resume at requested offset")
+                            self.send_head(http.client.REQUESTED_RANGE_NOT_SATISFIABLE, headers = {"upload-offset": partialSize(file_path)})
+                            return
 
-                        main_path, main_name = os.path.split(main_file)
+                        signature = self.write_file(file_path, offset = offset)
 
-                        if file_index > 0:
-                            file_path = createLocalPath(rfile, job.save_path, main_path, True)
-                        else:
-                            file_path = os.path.join(job.save_path, main_name)
+                        if signature is None: # connection dropped, keep partial file for resuming
+                            self.server.stats("", "File upload incomplete")
+                            self.send_head(http.client.BAD_REQUEST, headers = {"upload-offset": partialSize(file_path)})
+                            return
 
-                        # add same temp file + renames as slave
+                        rfile.filepath = file_path # set the new path
+                        found = rfile.updateStatus(signature) # make sure we have the right file
 
-                        self.write_file(file_path)
+                        if job.journal:
+                            job.journal.jobFile(job, rfile)
 
-                        rfile.filepath = file_path # set the new path
-                        found = rfile.updateStatus() # make sure we have the right file
+                        if found and self.server.file_cache:
+                            self.server.file_cache.add(rfile.signature, file_path)
 
                         if not found: # checksum mismatch
                             self.server.stats("", "File upload but checksum mismatch, this shouldn't happen")
                             self.send_head(http.client.CONFLICT)
-                        elif job.testStart(): # started correctly
+                        elif job.testFiles(self.server.file_cache): # started correctly
+                            with self.server.lock:
+                                job.start()
+
                             self.server.stats("", "File upload, starting job")
                             self.send_head(content = None)
                         else:
@@ -828,19 +1270,28 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 job = self.server.getJobID(job_id)
 
                 if job:
-                    job_frame = int(self.headers['job-frame'])
+                    # results without a file to upload can be reported for several frames at once
+                    job_frames = [int(number) for number in self.headers['job-frame'].split(",")]
                     job_result = int(self.headers['job-result'])
                     job_time = float(self.headers['job-time'])
 
-                    frame = job[job_frame]
-
-                    if frame:
-                        self.send_head(content = None)
+                    frames = [job[number] for number in job_frames]
+                    frame = frames[0]
 
+                    if all(frames):
                         if job.hasRenderResult():
                             if job_result == netrender.model.FRAME_DONE:
                                 frame.addDefaultRenderResult()
-                                self.write_file(job.getResultPath(frame.getRenderFilename()))
+                                filename = job.getResultPath(frame.getRenderFilename())
+
+                                if self.write_file(filename) is None: # connection dropped, frame stays dispatched
+                                    self.server.stats("", "Render result upload incomplete")
+                                    self.send_head(http.client.BAD_REQUEST, headers = {"upload-offset": partialSize(filename)})
+                                    return
+
+                                # have the thumbnail ready by the time the web page asks for it
+                                self.server.thumbnails.reset(filename)
+                                self.server.thumbnails.request(filename)
 
                             elif job_result == netrender.model.FRAME_ERROR:
                                 # blacklist slave on this job on error
@@ -848,12 +1299,23 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                                 if not slave.id in job.blacklist:
                                     job.blacklist.append(slave.id)
 
-                        slave.finishedFrame(job_frame)
+                                    if job.journal:
+                                        job.journal.jobBlacklist(job)
 
-                        frame.status = job_result
-                        frame.time = job_time
+                        with self.server.lock:
+                            for frame in frames:
+                                slave.finishedFrame(frame.number)
 
-                        job.testFinished()
+                                frame.time = job_time
+                                frame.status = job_result
+
+                            job.testFinished()
+
+                        if job.hasRenderResult() and job_result == netrender.model.FRAME_DONE:
+                            job.archiveFrame(frame)
+
+                        # answer once the result is recorded, the connection is reused right away
+                        self.send_head(content = None)
 
                     else: # frame not found
                         self.send_head(http.client.NO_CONTENT)
@@ -883,22 +1345,32 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                         job_result = int(self.headers['job-result'])
                         job_finished = self.headers['job-finished'] == str(True)
 
-                        self.send_head(content = None)
-
                         if job_result == netrender.model.FRAME_DONE:
                             result_filename = self.headers['result-filename']
+                            result_path = job.getResultPath(result_filename)
+
+                            if self.write_file(result_path) is None: # connection dropped, frame stays dispatched
+                                self.server.stats("", "Job result upload incomplete")
+                                self.send_head(http.client.BAD_REQUEST, headers = {"upload-offset": partialSize(result_path)})
+                                return
 
                             frame.results.append(result_filename)
-                            self.write_file(job.getResultPath(result_filename))
 
                         if job_finished:
                             job_time = float(self.headers['job-time'])
-                            slave.finishedFrame(job_frame)
 
-                            frame.status = job_result
-                            frame.time = job_time
+                            with self.server.lock:
+                                slave.finishedFrame(job_frame)
 
-                            job.testFinished()
+                                frame.time = job_time
+                                frame.status = job_result
+
+                                job.testFinished()
+
+                            if job_result == netrender.model.FRAME_DONE:
+                                job.archiveFrame(frame)
+
+                        self.send_head(content = None)
                     else: # frame not found
                         self.send_head(http.client.NO_CONTENT)
                 else: # job not found
@@ -924,11 +1396,11 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                     frame = job[job_frame]
 
                     if frame:
-                        self.send_head(content = None)
-
                         if job.hasRenderResult():
                             self.write_file(os.path.join(os.path.join(job.save_path, "%06d.jpg" % job_frame)))
 
+                        self.send_head(content = None)
+
                     else: # frame not found
                         self.send_head(http.client.NO_CONTENT)
                 else: # job not found
@@ -952,12 +1424,12 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                     frame = job[job_frame]
 
                     if frame and frame.log_path:
-                        self.send_head(content = None)
-
                         self.write_file(frame.log_path, 'ab')
 
                         self.server.getSeenSlave(self.headers['slave-id'])
 
+                        self.send_head(content = None)
+
                     else: # frame not found
                         self.send_head(http.client.NO_CONTENT)
                 else: # job not found
@@ -966,7 +1438,18 @@ class RenderHandler(http.server.BaseHTTPRequestHandler):
                 self.send_head(http.client.NO_CONTENT)
 
 class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
-    def __init__(self, address, handler_class, path, force=False, subdir=True):
+    # don't keep shutdown waiting on slaves with hanging connections
+    daemon_threads = True
+    # a large farm polls all at once, don't refuse connections while accepting
+    request_queue_size = 128
+
+    def __init__(self, address, handler_class, path, force=False, subdir=True, cache_path="", cache_size=0):
+        # protects jobs, slaves and frame status, request handlers run in their own threads
+        self.lock = threading.RLock()
+        self.request_count = 0
+        self.request_count_lock = threading.Lock()
+        self.request_rate_time = time.time()
+
         self.jobs = []
         self.jobs_map = {}
         self.slaves = []
@@ -981,23 +1464,42 @@ class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
 
         verifyCreateDir(self.path)
 
+        self.journal = None
+        self.thumbnails = thumbnail.ThumbnailPool()
+        with open(thumbnail.PLACEHOLDER_PATH, "rb") as f:
+            self.thumbnail_placeholder = f.read()
+
+        # dependency files shared between jobs, kept across master runs
+        self.file_cache = FileCache(cache_path, cache_size) if cache_path and cache_size > 0 else None
+
         self.slave_timeout = 5 # 5 mins: need a parameter for that
 
-        self.balancer = netrender.balancing.Balancer()
-        self.balancer.addRule(netrender.balancing.RatingUsageByCategory(self.getJobs))
-        self.balancer.addRule(netrender.balancing.RatingUsage())
-        self.balancer.addException(netrender.balancing.ExcludeQueuedEmptyJob())
-        self.balancer.addException(netrender.balancing.ExcludeSlavesLimit(self.countJobs, self.countSlaves, limit = 0.9))
-        self.balancer.addPriority(netrender.balancing.NewJobPriority())
-        self.balancer.addPriority(netrender.balancing.MinimumTimeBetweenDispatchPriority(limit = 2))
+        self.balancer = netrender.balancing.createBalancer(self.getJobs, self.countJobs, self.countSlaves)
 
         super().__init__(address, handler_class)
 
+    def countRequest(self):
+        # connections are kept alive, count requests as the handler parses them
+        with self.request_count_lock:
+            self.request_count += 1
+
+    def requestRate(self):
+        """Requests per second handled since the last call"""
+        with self.request_count_lock:
+            t = time.time()
+            rate = self.request_count / max(t - self.request_rate_time, 0.001)
+            self.request_count = 0
+            self.request_rate_time = t
+
+        return rate
+
     def restore(self, jobs, slaves, balancer = None):
         self.jobs = jobs
         self.jobs_map = {}
 
         for job in self.jobs:
+            job.balancer = self.balancer
+            job.rebuildIndex()
             self.jobs_map[job.id] = job
             self.job_id = max(self.job_id, int(job.id))
 
@@ -1007,22 +1509,107 @@ class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
 
         if balancer:
             self.balancer = balancer
+            for job in self.jobs:
+                job.balancer = balancer
+
+        self.balancer.invalidate()
+
+
+    def replay(self, entries):
+        """Restore jobs and slaves from journal entries"""
+        for entry in entries:
+            entry_type = entry["type"]
+
+            if entry_type == "master":
+                self.job_id = max(self.job_id, entry["job_id"])
+            elif entry_type == "slave":
+                slave = MRenderSlave(netrender.model.RenderSlave.materialize(entry["slave"], cache = False))
+                # address comes back as a list, keep the original id
+                netrender.model.RenderSlave._slave_map.pop(slave.id, None)
+                slave.id = entry["slave"]["id"]
+                netrender.model.RenderSlave._slave_map[slave.id] = slave
+                if slave.id in self.slaves_map:
+                    self.slaves.remove(self.slaves_map[slave.id])
+                self.slaves.append(slave)
+                self.slaves_map[slave.id] = slave
+            elif entry_type == "slave_remove":
+                slave = self.slaves_map.pop(entry["id"], None)
+                if slave:
+                    self.slaves.remove(slave)
+            elif entry_type == "job":
+                job = MRenderJob.materializeState(entry["job"], self.slaves_map)
+                if job.id in self.jobs_map:
+                    self.jobs.remove(self.jobs_map[job.id])
+                self.jobs.append(job)
+                self.jobs_map[job.id] = job
+                self.job_id = max(self.job_id, int(job.id))
+            elif entry_type == "job_remove":
+                job = self.jobs_map.pop(entry["id"], None)
+                if job:
+                    self.jobs.remove(job)
+            else:
+                job = self.jobs_map.get(entry["id"])
+                if not job:
+                    continue
+
+                if entry_type == "job_status":
+                    job.status = entry["status"]
+                    job.priority = entry["priority"]
+                    job.chunks = entry["chunks"]
+                    job.resolution = entry["resolution"]
+                elif entry_type == "frame":
+                    frame = job[entry["number"]]
+                    if frame:
+                        frame.time = entry["time"]
+                        frame.results = entry["results"]
+                        frame.log_path = entry["log_path"]
+                        frame.slave = self.slaves_map.get(entry["slave"]) if entry["slave"] else None
+                        frame.status = entry["status"]
+                elif entry_type == "file":
+                    rfile = job.files[entry["index"]]
+                    rfile.filepath = entry["filepath"]
+                    rfile.found = entry["found"]
+                elif entry_type == "blacklist":
+                    job.blacklist = entry["blacklist"]
+
+        # slaves still working on dispatched frames
+        for job in self.jobs:
+            for frame in job.frames:
+                if frame.status == netrender.model.FRAME_DISPATCHED and frame.slave:
+                    frame.slave.job = job
+                    frame.slave.job_frames.append(frame.number)
 
+        for job in self.jobs:
+            job.balancer = self.balancer
+
+        self.balancer.invalidate()
 
     def nextJobID(self):
-        self.job_id += 1
-        return str(self.job_id)
+        with self.lock:
+            self.job_id += 1
+            return str(self.job_id)
 
     def addSlave(self, slave_info):
         slave = MRenderSlave(slave_info)
-        self.slaves.append(slave)
-        self.slaves_map[slave.id] = slave
+
+        with self.lock:
+            self.slaves.append(slave)
+            self.slaves_map[slave.id] = slave
+            self.balancer.invalidate()
+
+            if self.journal:
+                self.journal.slave(slave)
 
         return slave.id
 
     def removeSlave(self, slave):
-        self.slaves.remove(slave)
-        self.slaves_map.pop(slave.id)
+        with self.lock:
+            self.slaves.remove(slave)
+            self.slaves_map.pop(slave.id)
+            self.balancer.invalidate()
+
+            if self.journal:
+                self.journal.removeSlave(slave)
 
     def getSlave(self, slave_id):
         return self.slaves_map.get(slave_id)
@@ -1039,38 +1626,53 @@ class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
 
         t = time.time()
 
-        for slave in self.slaves:
-            if (t - slave.last_seen) / 60 > self.slave_timeout:
-                removed.append(slave)
+        with self.lock:
+            for slave in self.slaves:
+                if (t - slave.last_seen) / 60 > self.slave_timeout:
+                    removed.append(slave)
 
-                if slave.job:
-                    for f in slave.job_frames:
-                        slave.job[f].status = netrender.model.FRAME_ERROR
+                    if slave.job:
+                        for f in slave.job_frames:
+                            slave.job[f].status = netrender.model.FRAME_ERROR
 
-        for slave in removed:
-            self.removeSlave(slave)
+            for slave in removed:
+                self.removeSlave(slave)
 
     def updateUsage(self):
         blend = 0.5
-        for job in self.jobs:
-            job.usage *= (1 - blend)
 
-        if self.slaves:
-            slave_usage = blend / self.countSlaves()
+        with self.lock:
+            for job in self.jobs:
+                job.usage *= (1 - blend)
 
-            for slave in self.slaves:
-                if slave.job:
-                    slave.job.usage += slave_usage
+            if self.slaves:
+                slave_usage = blend / self.countSlaves()
+
+                for slave in self.slaves:
+                    if slave.job:
+                        slave.job.usage += slave_usage
 
+            # usage changed for all jobs, time based priorities are also refreshed here
+            self.balancer.invalidate()
+
+    def housekeeping(self):
+        self.timeoutSlaves()
+        self.updateUsage()
+
+        if self.journal and self.journal.needsCompaction():
+            with self.lock:
+                self.journal.compact(self)
 
     def clear(self, clear_files = False):
-        removed = self.jobs[:]
+        with self.lock:
+            removed = self.jobs[:]
 
-        for job in removed:
-            self.removeJob(job, clear_files)
+            for job in removed:
+                self.removeJob(job, clear_files)
 
     def balance(self):
-        self.balancer.balance(self.jobs)
+        with self.lock:
+            self.balancer.balance(self.jobs)
 
     def getJobs(self):
         return self.jobs
@@ -1087,24 +1689,38 @@ class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
         return len(self.slaves)
 
     def removeJob(self, job, clear_files = False):
-        self.jobs.remove(job)
-        self.jobs_map.pop(job.id)
+        with self.lock:
+            self.jobs.remove(job)
+            self.jobs_map.pop(job.id)
+            self.balancer.invalidate()
+            job.balancer = None
+
+            if job.journal:
+                job.journal.removeJob(job)
+                job.journal = None
+
+            for slave in self.slaves:
+                if slave.job == job:
+                    slave.job = None
+                    slave.job_frames = []
 
         if clear_files:
             shutil.rmtree(job.save_path)
 
-        for slave in self.slaves:
-            if slave.job == job:
-                slave.job = None
-                slave.job_frames = []
-
     def addJob(self, job):
-        self.jobs.append(job)
-        self.jobs_map[job.id] = job
+        with self.lock:
+            self.jobs.append(job)
+            self.jobs_map[job.id] = job
+            self.balancer.invalidate()
+            job.balancer = self.balancer
+
+            # create job directory
+            job.save_path = os.path.join(self.path, "job_" + job.id)
+            verifyCreateDir(job.save_path)
 
-        # create job directory
-        job.save_path = os.path.join(self.path, "job_" + job.id)
-        verifyCreateDir(job.save_path)
+            if self.journal:
+                job.journal = self.journal
+                self.journal.job(job)
 
         job.save()
 
@@ -1112,15 +1728,22 @@ class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
         return self.jobs_map.get(id)
 
     def __iter__(self):
-        for job in self.jobs:
+        # iterate over a copy, jobs can be added or removed by other handlers meanwhile
+        with self.lock:
+            jobs = self.jobs[:]
+
+        for job in jobs:
             yield job
 
     def newDispatch(self, slave):
-        if self.jobs:
+        with self.lock:
             for job in self.jobs:
+                if self.balancer.isExcluded(job):
+                    # jobs are sorted with exceptions last, no need to look further
+                    break
+
                 if (
-                    not self.balancer.applyExceptions(job)      # No exceptions
-                    and slave.id not in job.blacklist           # slave is not blacklisted
+                    slave.id not in job.blacklist           # slave is not blacklisted
                     and (not slave.tags or job.tags.issubset(slave.tags))  # slave doesn't use tags or slave has all job tags
                          ):
 
@@ -1131,30 +1754,80 @@ class RenderMasterServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
 def clearMaster(path):
     shutil.rmtree(path)
 
-def createMaster(address, clear, force, path):
+def createMaster(address, clear, force, path, cache_size=0):
     filepath = os.path.join(path, "blender_master.data")
+    journal_path = os.path.join(path, "blender_master.journal")
+    cache_path = os.path.join(path, "cache")
 
-    if not clear and os.path.exists(filepath):
+    httpd = None
+
+    if not clear and os.path.exists(journal_path):
+        print("replaying master journal:", journal_path)
+        entries = MasterJournal.read(journal_path)
+
+        if entries and entries[0]["type"] == "master":
+            httpd = RenderMasterServer(address, RenderHandler, entries[0]["path"], force=force, subdir=False, cache_path=cache_path, cache_size=cache_size)
+            httpd.replay(entries)
+    elif not clear and os.path.exists(filepath):
         print("loading saved master:", filepath)
         with open(filepath, 'rb') as f:
             path, jobs, slaves = pickle.load(f)
 
-            httpd = RenderMasterServer(address, RenderHandler, path, force=force, subdir=False)
+            httpd = RenderMasterServer(address, RenderHandler, path, force=force, subdir=False, cache_path=cache_path, cache_size=cache_size)
             httpd.restore(jobs, slaves)
 
-            return httpd
+    if not httpd:
+        httpd = RenderMasterServer(address, RenderHandler, path, force=force, cache_path=cache_path, cache_size=cache_size)
+
+    # start from a compacted journal, then only append changes
+    httpd.journal = MasterJournal(journal_path)
+    httpd.journal.compact(httpd)
 
-    return RenderMasterServer(address, RenderHandler, path, force=force)
+    for job in httpd.jobs:
+        job.journal = httpd.journal
+
+    return httpd
 
 def saveMaster(path, httpd):
+    if httpd.journal:
+        httpd.journal.compact(httpd)
+        httpd.journal.close()
+
+        # journal supersedes the older full save
+        filepath = os.path.join(path, "blender_master.data")
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return
+
     filepath = os.path.join(path, "blender_master.data")
 
     with open(filepath, 'wb') as f:
         pickle.dump((httpd.path, httpd.jobs, httpd.slaves), f, pickle.HIGHEST_PROTOCOL)
 
-def runMaster(address, broadcast, clear, force, path, update_stats, test_break,use_ssl=False,cert_path="",key_path=""):
-    httpd = createMaster(address, clear, force, path)
-    httpd.timeout = 1
+class MasterHousekeeping(threading.Thread):
+    """Timer thread running slave timeouts, usage updates and broadcast next to the request handlers"""
+    def __init__(self, httpd, interval, broadcast = None):
+        super().__init__(daemon = True)
+        self.httpd = httpd
+        self.interval = interval
+        self.broadcast = broadcast
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.httpd.housekeeping()
+
+            if self.broadcast:
+                self.broadcast()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+HOUSEKEEPING_INTERVAL = 2 # seconds
+
+def runMaster(address, broadcast, clear, force, path, update_stats, test_break,use_ssl=False,cert_path="",key_path="",threaded=True,cache_size=0):
+    httpd = createMaster(address, clear, force, path, cache_size)
     httpd.stats = update_stats
     if use_ssl:
         import ssl
@@ -1170,7 +1843,53 @@ def runMaster(address, broadcast, clear, force, path, update_stats, test_break,u
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
-    start_time = time.time() - 2
+        def broadcastAddress():
+            print("broadcasting address")
+            s.sendto(bytes("%i" % address[1], encoding='utf8'), 0, ('<broadcast>', 8000))
+    else:
+        broadcastAddress = None
+
+    if threaded:
+        _runMasterThreaded(httpd, update_stats, test_break, broadcastAddress)
+    else:
+        _runMasterPolling(httpd, test_break, broadcastAddress)
+
+    httpd.server_close()
+    httpd.thumbnails.shutdown()
+    if clear:
+        if httpd.journal:
+            httpd.journal.close()
+            os.remove(httpd.journal.filepath)
+        clearMaster(httpd.path)
+    else:
+        saveMaster(path, httpd)
+
+def _runMasterThreaded(httpd, update_stats, test_break, broadcast):
+    # accept loop and housekeeping run in their own threads, main thread only watches for cancel
+    server_thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.5}, daemon=True)
+    server_thread.start()
+
+    housekeeping = MasterHousekeeping(httpd, HOUSEKEEPING_INTERVAL, broadcast)
+    housekeeping.start()
+
+    last_rate = time.time()
+
+    try:
+        while not test_break():
+            time.sleep(0.2)
+
+            if time.time() - last_rate >= HOUSEKEEPING_INTERVAL:
+                update_stats("", "Master: %.1f requests/s, %i slaves, %i jobs" % (httpd.requestRate(), httpd.countSlaves(), len(httpd.jobs)))
+                last_rate = time.time()
+    finally:
+        housekeeping.stop()
+        httpd.shutdown()
+        server_thread.join()
+
+def _runMasterPolling(httpd, test_break, broadcast):
+    httpd.timeout = 1
+
+    start_time = time.time() - HOUSEKEEPING_INTERVAL
 
     while not test_break():
         try:
@@ -1178,18 +1897,10 @@ def runMaster(address, broadcast, clear, force, path, update_stats, test_break,u
         except select.error:
             pass
 
-        if time.time() - start_time >= 2: # need constant here
-            httpd.timeoutSlaves()
-
-            httpd.updateUsage()
+        if time.time() - start_time >= HOUSEKEEPING_INTERVAL:
+            httpd.housekeeping()
 
             if broadcast:
-                print("broadcasting address")
-                s.sendto(bytes("%i" % address[1], encoding='utf8'), 0, ('<broadcast>', 8000))
-                start_time = time.time()
+                broadcast()
 
-    httpd.server_close()
-    if clear:
-        clearMaster(httpd.path)
-    else:
-        saveMaster(path, httpd)
+            start_time = time.time()
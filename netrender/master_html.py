@@ -17,7 +17,6 @@
 # ##### END GPL LICENSE BLOCK #####
 
 import os
-import shutil
 from netrender.utils import *
 import netrender.model
 import json
@@ -49,8 +48,11 @@ def countFiles(job):
 
 
 def get(handler):
+    # html pages are built completely before sending, so the response has a length
+    page = []
+
     def output(text):
-        handler.wfile.write(bytes(text, encoding='utf8'))
+        page.append(text)
 
     def head(title, refresh = False):
         output("<html><head>")
@@ -114,16 +116,10 @@ def get(handler):
         return """<input type="checkbox" title="%s" %s %s>""" % (title, "checked" if value else "", ("onclick=\"%s\"" % script) if script else "")
 
     def sendjson(message):
-        handler.send_head(content = "application/json")
-        output(json.dumps(message,sort_keys=False))
+        handler.send_data(json.dumps(message,sort_keys=False), content = "application/json")
 
     def sendFile(filename,content_type):
-        f = open(os.path.join(src_folder,filename), 'rb')
-
-        handler.send_head(content = content_type)
-        shutil.copyfileobj(f, handler.wfile)
-
-        f.close()
+        handler.send_file(os.path.join(src_folder,filename), content = content_type)
     # return serialized version of job for html interface
     # job: the base job
     # includeFiles: boolean to indicate if we want file to be serialized too into job
@@ -304,7 +300,6 @@ def get(handler):
            sendjson(message)
     # here begin code for simple ui
     elif handler.path == "/html" or handler.path == "/":
-        handler.send_head(content = "text/html")
         head("NetRender", refresh = True)
 
         output("<h2>Jobs</h2>")
@@ -423,7 +418,6 @@ def get(handler):
         output("</body></html>")
 
     elif handler.path.startswith("/html/job"):
-        handler.send_head(content = "text/html")
         job_id = handler.path[9:]
 
         head("NetRender")
@@ -558,3 +552,6 @@ def get(handler):
         output(link("Back to Main Page", "/html"))
 
         output("</body></html>")
+
+    if page:
+        handler.send_data("".join(page), content = "text/html")
@@ -47,7 +47,7 @@ class RENDER_OT_netclientsendbake(bpy.types.Operator):
             if conn:
                 # Sending file
                 client.sendJobBaking(conn, scene)
-                conn.close()
+                releaseConnection(conn)
                 self.report({'INFO'}, "Job sent to master")
         except Exception as err:
             self.report({'ERROR'}, str(err))
@@ -75,7 +75,7 @@ class RENDER_OT_netclientanim(bpy.types.Operator):
         if conn:
             # Sending file
             scene.network_render.job_id = client.sendJob(conn, scene, True)
-            conn.close()
+            releaseConnection(conn)
 
         bpy.ops.render.render('INVOKE_AREA', animation=True)
 
@@ -120,7 +120,7 @@ class RENDER_OT_netclientsend(bpy.types.Operator):
             if conn:
                 # Sending file
                 scene.network_render.job_id = client.sendJob(conn, scene, True)
-                conn.close()
+                releaseConnection(conn)
                 self.report({'INFO'}, "Job sent to master")
         except Exception as err:
             self.report({'ERROR'}, str(err))
@@ -150,7 +150,7 @@ class RENDER_OT_netclientsendframe(bpy.types.Operator):
             if conn:
                 # Sending file
                 scene.network_render.job_id = client.sendJob(conn, scene, False)
-                conn.close()
+                releaseConnection(conn)
                 self.report({'INFO'}, "Job sent to master")
         except Exception as err:
             self.report({'ERROR'}, str(err))
@@ -180,6 +180,7 @@ class RENDER_OT_netclientstatus(bpy.types.Operator):
             response = conn.getresponse()
             content = response.read()
             print( response.status, response.reason )
+            releaseConnection(conn)
 
             jobs = (netrender.model.RenderJob.materialize(j) for j in json.loads(str(content, encoding='utf8')))
 
@@ -282,6 +283,7 @@ class RENDER_OT_netclientslaves(bpy.types.Operator):
             response = conn.getresponse()
             content = response.read()
             print( response.status, response.reason )
+            releaseConnection(conn)
 
             slaves = (netrender.model.RenderSlave.materialize(s) for s in json.loads(str(content, encoding='utf8')))
 
@@ -336,6 +338,7 @@ class RENDER_OT_netclientcancel(bpy.types.Operator):
             response = conn.getresponse()
             response.read()
             print( response.status, response.reason )
+            releaseConnection(conn)
 
             netsettings.jobs.remove(netsettings.active_job_index)
 
@@ -363,6 +366,7 @@ class RENDER_OT_netclientcancelall(bpy.types.Operator):
             response = conn.getresponse()
             response.read()
             print( response.status, response.reason )
+            releaseConnection(conn)
 
             while(len(netsettings.jobs) > 0):
                 netsettings.jobs.remove(0)
@@ -402,7 +406,7 @@ class netclientdownload(bpy.types.Operator):
 
             job = netrender.model.RenderJob.materialize(json.loads(str(content, encoding='utf8')))
 
-            conn.close()
+            releaseConnection(conn)
 
             finished_frames = []
 
@@ -534,7 +538,7 @@ class netclientweb(bpy.types.Operator):
         conn = clientConnection(netsettings, report = self.report)
 
         if conn:
-            conn.close()
+            releaseConnection(conn)
             if netsettings.use_ssl:
                webbrowser.open("https://%s:%i" % (netsettings.server_address, netsettings.server_port))
             else:
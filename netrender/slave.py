@@ -64,11 +64,20 @@ def testCancel(conn, job_id, frame_number):
         else:
             return False
 
-def testFile(conn, job_id, slave_id, rfile, job_prefix, main_path=None):
+def testFile(conn, job_id, slave_id, rfile, job_prefix, main_path=None, file_cache=None):
     job_full_path = createLocalPath(rfile, job_prefix, main_path, rfile.force)
 
     found = os.path.exists(job_full_path)
 
+    if not found and file_cache and rfile.signature in file_cache:
+        # same content was already downloaded for another job
+        job_full_path = createLocalPath(rfile, job_prefix, main_path, True)
+        found = file_cache.link(rfile.signature, job_full_path)
+        if found:
+            print("Using cached", job_full_path)
+            rfile.filepath = job_full_path
+            return job_full_path
+
     if found and rfile.signature is not None:
         found_signature = hashFile(job_full_path)
         found = found_signature == rfile.signature
@@ -81,24 +90,37 @@ def testFile(conn, job_id, slave_id, rfile, job_prefix, main_path=None):
         # Force prefix path if not found
         job_full_path = createLocalPath(rfile, job_prefix, main_path, True)
         print("Downloading", job_full_path)
-        temp_path = os.path.join(job_prefix, "slave.temp")
+
+        # continue a previously interrupted download
+        offset = partialSize(job_full_path)
+        headers = {"slave-id":slave_id}
+        if offset:
+            headers["range"] = "bytes=%i-" % offset
+
         with ConnectionContext():
-            conn.request("GET", fileURL(job_id, rfile.index), headers={"slave-id":slave_id})
+            conn.request("GET", fileURL(job_id, rfile.index), headers=headers)
         response = conn.getresponse()
 
-        if response.status != http.client.OK:
+        if response.status == http.client.OK:
+            offset = 0 # server sent the whole file
+        elif response.status != http.client.PARTIAL_CONTENT:
+            response.read()
             return None # file for job not returned by server, need to return an error code to server
 
-        f = open(temp_path, "wb")
-        buf = response.read(1024)
+        length = response.getheader("content-length")
+        signature = streamToFile(response, job_full_path, int(length) if length else None, offset)
 
-        while buf:
-            f.write(buf)
-            buf = response.read(1024)
+        if signature is None:
+            print("Download of %s interrupted" % job_full_path)
+            return None
 
-        f.close()
+        if rfile.signature is not None and signature != rfile.signature:
+            print("Downloaded file %s but signature mismatch!" % job_full_path)
+            os.remove(job_full_path)
+            return None
 
-        os.renames(temp_path, job_full_path)
+        if file_cache:
+            file_cache.add(rfile.signature, job_full_path)
 
     rfile.filepath = job_full_path
 
@@ -152,6 +174,9 @@ def render_slave(engine, netsettings, threads):
         NODE_PREFIX = os.path.join(slave_path, "slave_" + slave_id)
         verifyCreateDir(NODE_PREFIX)
 
+        # outside of the node directory so it's kept when clearing on exit
+        file_cache = FileCache(os.path.join(slave_path, "cache"), netsettings.cache_size * 1024 * 1024) if netsettings.cache_size > 0 else None
+
         engine.update_stats("", "Network render connected to master, waiting for jobs")
 
         while not engine.test_break():
@@ -177,12 +202,12 @@ def render_slave(engine, netsettings, threads):
                     job_path = job.files[0].original_path # original path of the first file
                     main_path, main_file = os.path.split(job_path)
 
-                    job_full_path = testFile(conn, job.id, slave_id, job.files[0], job_prefix)
+                    job_full_path = testFile(conn, job.id, slave_id, job.files[0], job_prefix, file_cache=file_cache)
                     print("Fullpath", job_full_path)
                     print("File:", main_file, "and %i other files" % (len(job.files) - 1,))
 
                     for rfile in job.files[1:]:
-                        testFile(conn, job.id, slave_id, rfile, job_prefix, main_path)
+                        testFile(conn, job.id, slave_id, rfile, job_prefix, main_path, file_cache)
                         print("\t", rfile.filepath)
 
                     netrender.repath.update(job)
@@ -289,11 +314,12 @@ def render_slave(engine, netsettings, threads):
                         data.lock.acquire()
 
                         # update logs if needed
+                        log_status = None
                         if data.stdout:
                             # (only need to update on one frame, they are linked
                             with ConnectionContext():
                                 conn.request("PUT", logURL(job.id, first_frame), data.stdout, headers=headers)
-                            responseStatus(conn)
+                            log_status = responseStatus(conn)
 
                             stdout_text = str(data.stdout, encoding='utf8')
 
@@ -312,7 +338,14 @@ def render_slave(engine, netsettings, threads):
                         data.lock.release()
 
                         data.last_time = current_time
-                        if testCancel(conn, job.id, first_frame):
+
+                        # the log update already tells if the frame is still there, no need to ask again
+                        if log_status is not None:
+                            canceled = log_status == http.client.NO_CONTENT
+                        else:
+                            canceled = testCancel(conn, job.id, first_frame)
+
+                        if canceled:
                             engine.update_stats("", "Job canceled by Master")
                             data.cancelled = True
 
@@ -398,23 +431,23 @@ def render_slave(engine, netsettings, threads):
                                 if response_status == http.client.NO_CONTENT:
                                     continue
 
-                        elif job.type == netrender.model.JOB_PROCESS:
-                            with ConnectionContext():
-                                conn.request("PUT", "/render", headers=headers)
-                            if responseStatus(conn) == http.client.NO_CONTENT:
-                                continue
-                else:
-                    headers["job-result"] = str(netrender.model.FRAME_ERROR)
-                    for frame in job.frames:
-                        headers["job-frame"] = str(frame.number)
-                        # send error result back to server
+                    if job.type == netrender.model.JOB_PROCESS and not job.hasRenderResult() and job.subtype != netrender.model.JOB_SUB_BAKING:
+                        # nothing to upload, report all frames at once
+                        headers["job-frame"] = ",".join(str(frame.number) for frame in job.frames)
                         with ConnectionContext():
                             conn.request("PUT", "/render", headers=headers)
-                        if responseStatus(conn) == http.client.NO_CONTENT:
-                            continue
+                        responseStatus(conn)
+                else:
+                    headers["job-result"] = str(netrender.model.FRAME_ERROR)
+                    # send error result back to server, for all frames at once
+                    headers["job-frame"] = ",".join(str(frame.number) for frame in job.frames)
+                    with ConnectionContext():
+                        conn.request("PUT", "/render", headers=headers)
+                    responseStatus(conn)
 
                 engine.update_stats("", "Network render connected to master, waiting for jobs")
             else:
+                response.read()
                 bisleep.sleep()
 
         conn.close()
@@ -18,10 +18,26 @@
 
 import sys, os
 import subprocess
+import threading
+import concurrent.futures
 
 import bpy
 
+THUMBNAIL_SIZE = 300
+PLACEHOLDER_PATH = os.path.join(os.path.dirname(__file__), "thumb_pending.jpg") # served while a thumbnail isn't ready
+
 def generate(filename, external=True):
+    # in process when OpenImageIO is available, much faster than starting Blender
+    try:
+        thumbname = _oiio(filename)
+    except Exception as exp:
+        print("Error while generating thumbnail with OpenImageIO")
+        print(exp)
+        thumbname = None
+
+    if thumbname:
+        return thumbname
+
     if external:
         process = subprocess.Popen(
             [bpy.app.binary_path,
@@ -47,6 +63,110 @@ def _thumbname(filename):
     root = os.path.splitext(filename)[0]
     return root + ".jpg"
 
+def _oiio(filename):
+    try:
+        import OpenImageIO as oiio
+    except ImportError:
+        return None
+
+    thumbname = _thumbname(filename)
+
+    source = oiio.ImageBuf(filename)
+    if source.has_error:
+        print("Error while reading", filename, source.geterror())
+        return None
+
+    spec = source.spec()
+    scale = THUMBNAIL_SIZE / max(spec.width, spec.height, 1)
+    width = max(int(spec.width * scale), 1)
+    height = max(int(spec.height * scale), 1)
+
+    # keep RGB only, renders are scene linear
+    channels = tuple(range(min(spec.nchannels, 3)))
+    source = oiio.ImageBufAlgo.channels(source, channels)
+    thumb = oiio.ImageBufAlgo.resize(source, roi=oiio.ROI(0, width, 0, height, 0, 1, 0, len(channels)))
+    thumb = oiio.ImageBufAlgo.colorconvert(thumb, "linear", "sRGB")
+
+    if not thumb.write(thumbname, "uint8", "jpeg"):
+        print("Error while writing thumbnail", thumbname, thumb.geterror())
+        return None
+
+    return thumbname
+
+class ThumbnailPool:
+    """Generate thumbnails in a bounded set of worker threads.
+
+    Thumbnails are cached on disk next to the image, and regenerated when the image
+    size or modification time changed since they were made here.
+    """
+    def __init__(self, workers = None):
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1)
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers = workers)
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.failed = set()
+        self.done = {} # filename: (mtime, size) of the image when its thumbnail was made
+
+    def _key(self, filename):
+        stat = os.stat(filename)
+        return (stat.st_mtime, stat.st_size)
+
+    def _isValid(self, filename):
+        if not os.path.exists(_thumbname(filename)):
+            return False
+
+        # thumbnails not made here (by slaves or a previous master run) are kept as is
+        key = self.done.get(filename)
+        return key is None or key == self._key(filename)
+
+    def _generate(self, filename):
+        try:
+            key = self._key(filename)
+            thumbname = generate(filename)
+        except Exception as exp:
+            print("Error while generating thumbnail")
+            print(exp)
+            thumbname = None
+
+        with self.lock:
+            self.pending.discard(filename)
+            if thumbname and os.path.exists(thumbname):
+                self.done[filename] = key
+            else:
+                self.failed.add(filename)
+
+    def request(self, filename):
+        """Return the thumbnail path if ready, otherwise queue its generation and return None"""
+        with self.lock:
+            if filename in self.pending:
+                return None
+
+            if self._isValid(filename):
+                return _thumbname(filename)
+
+            if filename in self.failed:
+                return None
+
+            self.pending.add(filename)
+
+        self.executor.submit(self._generate, filename)
+        return None
+
+    def hasFailed(self, filename):
+        with self.lock:
+            return filename in self.failed
+
+    def reset(self, filename):
+        """Forget about a previous failure, when the image is replaced"""
+        with self.lock:
+            self.failed.discard(filename)
+            self.done.pop(filename, None)
+
+    def shutdown(self):
+        self.executor.shutdown(wait = False)
+
 def _internal(filename):
     imagename = os.path.split(filename)[1]
     thumbname = _thumbname(filename)
@@ -73,7 +193,7 @@ def _internal(filename):
         bpy.data.images.remove(img)
 
         try:
-            process = subprocess.Popen(["convert", thumbname, "-resize", "300x300", thumbname])
+            process = subprocess.Popen(["convert", thumbname, "-resize", "%ix%i" % (THUMBNAIL_SIZE, THUMBNAIL_SIZE), thumbname])
             process.wait()
             return thumbname
         except Exception as exp:
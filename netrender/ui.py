@@ -76,7 +76,7 @@ def verify_address(netsettings, force=False):
 
         if conn:
             netrender.valid_address = True
-            conn.close()
+            releaseConnection(conn)
         else:
             netrender.valid_address = False
 
@@ -121,6 +121,9 @@ class RENDER_PT_network_settings(NetRenderButtonsPanel, bpy.types.Panel):
 
         layout.prop(netsettings, "path")
 
+        if netsettings.mode in {'RENDER_MASTER', 'RENDER_SLAVE'}:
+            layout.prop(netsettings, "cache_size")
+
         row = layout.row()
 
         split = layout.split(factor=0.5)
@@ -193,6 +196,7 @@ class RENDER_PT_network_master_settings(NetRenderButtonsPanel, bpy.types.Panel):
         layout.prop(netsettings, "use_master_broadcast")
         layout.prop(netsettings, "use_master_force_upload")
         layout.prop(netsettings, "use_master_clear")
+        layout.prop(netsettings, "use_master_threaded")
 
 class RENDER_PT_network_job(NetRenderButtonsPanel, bpy.types.Panel):
     bl_label = "Job Settings"
@@ -474,6 +478,11 @@ class NetRenderSettings(bpy.types.PropertyGroup):
                         description="Force client to upload dependency files to master",
                         default = False)
 
+        NetRenderSettings.use_master_threaded = BoolProperty(
+                        name="Concurrent Server",
+                        description="Serve requests and run maintenance in separate threads instead of polling one request at a time",
+                        default = True)
+
         default_path = os.environ.get("TEMP")
 
         if not default_path:
@@ -484,6 +493,12 @@ class NetRenderSettings(bpy.types.PropertyGroup):
         elif not default_path.endswith(os.sep):
             default_path += os.sep
 
+        NetRenderSettings.cache_size = IntProperty(
+                        name="Cache Size (MB)",
+                        description="Size of the dependency files cache shared between jobs, 0 to disable",
+                        default = 10240,
+                        min=0)
+
         NetRenderSettings.path = StringProperty(
                         name="Path",
                         description="Path for temporary files",
@@ -19,6 +19,7 @@
 import sys, os, re, platform
 import http, http.client, http.server, socket
 import subprocess, time, hashlib
+import shutil, threading, select
 
 import netrender, netrender.model
 
@@ -159,6 +160,88 @@ def clientScan(report = None):
 
         return ("", 8000) # return default values
 
+class KeepAliveConnectionMixin:
+    """Reconnects before sending a request if the master closed the idle connection in the meantime
+    or the previous response wasn't read completely"""
+    last_response = None
+
+    def request(self, *args, **kwargs):
+        if self.sock and not (self.idle() and connectionAlive(self.sock)):
+            self.close()
+
+        super().request(*args, **kwargs)
+
+    def getresponse(self):
+        self.last_response = super().getresponse()
+        return self.last_response
+
+    def idle(self):
+        return self.last_response is None or self.last_response.isclosed()
+
+class KeepAliveHTTPConnection(KeepAliveConnectionMixin, http.client.HTTPConnection):
+    pass
+
+class KeepAliveHTTPSConnection(KeepAliveConnectionMixin, http.client.HTTPSConnection):
+    pass
+
+def connectionAlive(sock):
+    # an idle connection has nothing to read, unless the other side closed it
+    try:
+        readable = select.select([sock], [], [], 0)[0]
+    except (OSError, ValueError):
+        return False
+
+    return not readable
+
+class ConnectionPool:
+    """Idle connections to masters, handed out again by clientConnection instead of opening new ones"""
+    def __init__(self, max_idle = 4):
+        self.lock = threading.Lock()
+        self.max_idle = max_idle
+        self.connections = {}
+
+    def acquire(self, key):
+        with self.lock:
+            idle = self.connections.get(key)
+
+            while idle:
+                conn, last_used = idle.pop()
+
+                if time.time() - last_used < KEEP_ALIVE_TIMEOUT and conn.sock and connectionAlive(conn.sock):
+                    return conn
+
+                conn.close()
+
+        return None
+
+    def release(self, conn):
+        key = getattr(conn, "pool_key", None)
+
+        # only reuse connections with no response pending
+        if key is None or not conn.sock or not conn.idle():
+            conn.close()
+            return
+
+        with self.lock:
+            idle = self.connections.setdefault(key, [])
+
+            if len(idle) < self.max_idle:
+                idle.append((conn, time.time()))
+                conn = None
+
+        if conn:
+            conn.close()
+
+    def clear(self):
+        with self.lock:
+            for idle in self.connections.values():
+                for conn, last_used in idle:
+                    conn.close()
+
+            self.connections = {}
+
+connection_pool = ConnectionPool()
+
 def clientConnection(netsettings, report = None, scan = True, timeout = 50):
     address = netsettings.server_address
     port = netsettings.server_port
@@ -175,9 +258,18 @@ def clientConnection(netsettings, report = None, scan = True, timeout = 50):
         address, port = clientScan()
         if address == "":
             return None
+
+    # already verified connection to the same master
+    key = (address, port, use_ssl)
+    conn = connection_pool.acquire(key)
+    if conn:
+        conn.timeout = timeout
+        conn.sock.settimeout(timeout)
+        return conn
+
     conn = None
     try:
-        HTTPConnection = http.client.HTTPSConnection if use_ssl else http.client.HTTPConnection
+        HTTPConnection = KeepAliveHTTPSConnection if use_ssl else KeepAliveHTTPConnection
         if platform.system() == "Darwin":
             with ConnectionContext(timeout):
                 conn = HTTPConnection(address, port)
@@ -186,6 +278,7 @@ def clientConnection(netsettings, report = None, scan = True, timeout = 50):
 
         if conn:
             if clientVerifyVersion(conn, timeout):
+                conn.pool_key = key
                 return conn
             else:
                 conn.close()
@@ -198,6 +291,10 @@ def clientConnection(netsettings, report = None, scan = True, timeout = 50):
             print(err)
             return None
 
+def releaseConnection(conn):
+    """Done with a connection from clientConnection, keep it open for the next one"""
+    connection_pool.release(conn)
+
 def clientVerifyVersion(conn, timeout):
     with ConnectionContext(timeout):
         conn.request("GET", "/version")
@@ -222,26 +319,220 @@ def fileURL(job_id, file_index):
 def logURL(job_id, frame_number):
     return "/log_%s_%i.log" % (job_id, frame_number)
 
-def resultURL(job_id):
+def resultURL(job_id, frame_ranges = None):
+    # frame_ranges: list of (start, end) or (frame,) tuples, all done frames when None
+    if frame_ranges:
+        return "/result_%s.zip?frames=%s" % (job_id, ",".join("-".join(str(n) for n in r) for r in frame_ranges))
     return "/result_%s.zip" % job_id
 
+def parseFrameRanges(text):
+    """Parse "1-10,15" into a list of (start, end) tuples, raises ValueError on inverted or negative ranges"""
+    ranges = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part[1:]:
+            index = part.index("-", 1)
+            start, end = int(part[:index]), int(part[index + 1:])
+        else:
+            start = end = int(part)
+
+        if start < 0 or end < start:
+            raise ValueError("Invalid frame range %s" % part)
+
+        ranges.append((start, end))
+    return ranges
+
 def renderURL(job_id, frame_number):
     return "/render_%s_%i.exr" % (job_id, frame_number)
 
 def cancelURL(job_id):
     return "/cancel_%s" % (job_id)
 
+TRANSFER_CHUNK_SIZE = 1024 * 1024 # bytes read and written at once when copying or hashing files
+
+KEEP_ALIVE_TIMEOUT = 120 # seconds an idle connection is kept open
+KEEP_ALIVE_DRAIN_SIZE = 4 * TRANSFER_CHUNK_SIZE # unread request bodies larger than this close the connection instead
+
 def hashFile(path):
-    f = open(path, "rb")
-    value = hashData(f.read())
-    f.close()
-    return value
+    m = hashlib.md5()
+    with open(path, "rb") as f:
+        buf = f.read(TRANSFER_CHUNK_SIZE)
+        while buf:
+            m.update(buf)
+            buf = f.read(TRANSFER_CHUNK_SIZE)
+    return m.hexdigest()
 
 def hashData(data):
     m = hashlib.md5()
     m.update(data)
     return m.hexdigest()
 
+def copyChunks(source, dest, length = None, m = None):
+    """Copy length bytes (everything when None) from source to dest in fixed size chunks,
+    updating the hash object m if given. Returns False if source ended early."""
+    while length is None or length > 0:
+        buf = source.read(TRANSFER_CHUNK_SIZE if length is None else min(TRANSFER_CHUNK_SIZE, length))
+        if not buf:
+            return length is None
+
+        dest.write(buf)
+        if m:
+            m.update(buf)
+        if length is not None:
+            length -= len(buf)
+
+    return True
+
+def partialPath(file_path):
+    return file_path + ".part"
+
+def partialSize(file_path):
+    """Size of the incomplete transfer kept for file_path, offset to resume from"""
+    part_path = partialPath(file_path)
+    if os.path.exists(part_path):
+        return os.path.getsize(part_path)
+    return 0
+
+def streamToFile(source, file_path, length = None, offset = 0, mode = 'wb'):
+    """Write length bytes from source to file_path without holding the data in memory.
+
+    Data goes to a partial file next to file_path, renamed over it once complete. When offset is
+    not zero, the transfer continues the partial file from that offset (see partialSize).
+    Returns the MD5 signature of the complete file, None if source ended early (the partial file
+    is kept to resume). Append mode writes directly to file_path and doesn't compute a signature.
+    """
+    if mode == 'ab':
+        with open(file_path, mode) as f:
+            copyChunks(source, f, length)
+        return None
+
+    part_path = partialPath(file_path)
+    m = hashlib.md5()
+
+    if offset:
+        f = open(part_path, "r+b")
+        # signature has to include what was received before
+        if not copyChunks(f, DiscardFile(), offset, m):
+            f.close()
+            raise ValueError("Partial file %s is smaller than resume offset %i" % (part_path, offset))
+        f.truncate(offset)
+    else:
+        f = open(part_path, "wb")
+
+    with f:
+        complete = copyChunks(source, f, length, m)
+
+    if not complete:
+        return None
+
+    os.replace(part_path, file_path)
+
+    return m.hexdigest()
+
+class DiscardFile:
+    def write(self, buf):
+        pass
+
+class FileCache:
+    """Content addressed store of job dependencies, shared between jobs.
+
+    Files are stored by signature and hard linked (copied where links aren't supported)
+    into job directories, least recently used files are removed above max_size bytes.
+    """
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = {} # signature: [size, last used time]
+        self.size = 0
+
+        verifyCreateDir(self.path)
+
+        for directory in os.listdir(self.path):
+            directory_path = os.path.join(self.path, directory)
+            if os.path.isdir(directory_path):
+                for signature in os.listdir(directory_path):
+                    stat = os.stat(os.path.join(directory_path, signature))
+                    self.entries[signature] = [stat.st_size, stat.st_mtime]
+                    self.size += stat.st_size
+
+    def filePath(self, signature):
+        return os.path.join(self.path, signature[:2], signature)
+
+    def __contains__(self, signature):
+        return signature in self.entries
+
+    def link(self, signature, file_path):
+        """Put the cached file for signature at file_path, returns False if not in cache"""
+        with self.lock:
+            entry = self.entries.get(signature)
+            if not entry:
+                return False
+
+            entry[1] = time.time()
+            cache_path = self.filePath(signature)
+
+            try:
+                os.utime(cache_path, (entry[1], entry[1]))
+                _linkOrCopy(cache_path, file_path)
+            except OSError as err:
+                print("Couldn't use cached file", cache_path, err)
+                return False
+
+        return True
+
+    def add(self, signature, file_path):
+        """Store a file whose content matches signature"""
+        if not signature or self.max_size <= 0:
+            return
+
+        with self.lock:
+            if signature in self.entries:
+                return
+
+            cache_path = self.filePath(signature)
+            verifyCreateDir(os.path.dirname(cache_path))
+
+            try:
+                _linkOrCopy(file_path, cache_path)
+            except OSError as err:
+                print("Couldn't cache file", file_path, err)
+                return
+
+            size = os.path.getsize(cache_path)
+            self.entries[signature] = [size, time.time()]
+            self.size += size
+
+            self._evict()
+
+    def _evict(self):
+        if self.size <= self.max_size:
+            return
+
+        for signature, (size, last_used) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+            if self.size <= self.max_size:
+                break
+
+            try:
+                os.remove(self.filePath(signature))
+            except OSError:
+                pass
+
+            del self.entries[signature]
+            self.size -= size
+
+def _linkOrCopy(source_path, dest_path):
+    # replace what is there, it's either stale or the same content
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+
+    try:
+        os.link(source_path, dest_path)
+    except OSError:
+        shutil.copyfile(source_path, dest_path)
+
 def verifyCreateDir(directory_path):
     original_path = directory_path
     directory_path = os.path.expanduser(directory_path)
@@ -447,14 +738,32 @@ def getFileInfo(filepath, infos):
     return values
 
 
-def sendFile(conn, url, filepath, headers={}):
+def sendFile(conn, url, filepath, headers={}, offset=0):
+    """PUT a file, resending from the offset the server asks for when it can't resume at offset"""
     file_size = os.path.getsize(filepath)
-    if not 'content-length' in headers:
-        headers['content-length'] = file_size
-    with open(filepath, "rb") as f:
-        with ConnectionContext():
-            conn.request("PUT", url, f, headers=headers)
-    return responseStatus(conn)
+    while True:
+        # copy, callers reuse their headers for several files
+        file_headers = dict(headers)
+        if offset or not 'content-length' in file_headers:
+            file_headers['content-length'] = file_size - offset
+        if offset:
+            file_headers['upload-offset'] = offset
+        with open(filepath, "rb") as f:
+            f.seek(offset)
+            with ConnectionContext():
+                conn.request("PUT", url, f, headers=file_headers)
+
+        with conn.getresponse() as response:
+            response.read()
+            if response.status != http.client.REQUESTED_RANGE_NOT_SATISFIABLE:
+                return response.status
+
+            server_offset = int(response.getheader("upload-offset", "0"))
+
+        if server_offset == offset or server_offset > file_size:
+            return http.client.REQUESTED_RANGE_NOT_SATISFIABLE
+
+        offset = server_offset
 
 
 if __name__ == "__main__":
@@ -71,6 +71,8 @@ class OBJECT_PT_FRACTURE_Panel(Panel):
         layout.label(text="Use Fracture It First")
         layout.operator("object.add_fracture_cell",
                     text="Fracture It")
+        layout.operator(operator.FRACTURE_OT_CellSplit.bl_idname,
+                    text="Split Cells")
         layout.label(text="Use Crack It To Displace")
         layout.operator(operator.FRACTURE_OT_Crack.bl_idname,
                     text="Crack It")
@@ -163,6 +165,11 @@ class FractureCellProperties(PropertyGroup):
             min=0.0, max=1.0,
             default=(1.0, 1.0, 1.0),
             )
+    use_parallel: BoolProperty(
+            name="Parallel",
+            description="Compute the cells in separate processes, one per CPU core (faster for many cells)",
+            default=False,
+            )
     pre_simplify : FloatProperty(
             name="Simplify Base Mesh",
             description="Simplify base mesh before making cell. Lower face size, faster calculation",
@@ -180,6 +187,15 @@ class FractureCellProperties(PropertyGroup):
             description="Split disconnected meshes",
             default=True,
             )
+    clip_mode: EnumProperty(
+            name="Clipping",
+            items=(('BOOLEAN', "Boolean", "Intersect the cells with the original using boolean modifiers"),
+                   ('CONVEX', "Convex", "Clip the cells with the faces of the original when it's convex (without UVs), "
+                                        "else use boolean modifiers"),
+                   ('HULL', "Convex Hull", "Clip the cells with the convex hull of the original (without UVs)"),
+                   ),
+            default='BOOLEAN',
+            )
     # -------------------------------------------------------------------------
     # Recursion
     recursion: IntProperty(
@@ -275,6 +291,14 @@ class FractureCellProperties(PropertyGroup):
             description="Move cells beside the original object",
             default=False,
             )
+    use_single_mesh: BoolProperty(
+            name="Single Mesh",
+            description="Build all cells into one mesh, the cell of each face is kept in the \"cell_index\" "
+                        "face attribute (use Split Cells to make one object per cell). Without an object per cell "
+                        "only with Convex or Convex Hull clipping of a convex original and no recursion, "
+                        "otherwise the cells are joined once made",
+            default=False,
+            )
     # -------------------------------------------------------------------------
     # Custom Property Options
     use_mass: BoolProperty(
@@ -394,6 +418,7 @@ classes = (
     FractureCrackProperties,
     FractureMaterialProperties,
     operator.FRACTURE_OT_Cell,
+    operator.FRACTURE_OT_CellSplit,
     operator.FRACTURE_OT_Crack,
     operator.FRACTURE_OT_Material,
     OBJECT_PT_FRACTURE_Panel,
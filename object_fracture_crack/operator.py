@@ -2,12 +2,14 @@
 if "bpy" in locals():
     import importlib
     importlib.reload(cell_main)
+    importlib.reload(cell_functions)
     importlib.reload(crack_functions)
     importlib.reload(material_functions)
     importlib.reload(utilities)
 
 else:
     from .process import cell_main
+    from .process import cell_functions
     from .process import crack_functions
     from .process import material_functions
     from . import utilities
@@ -75,6 +77,9 @@ class FRACTURE_OT_Cell(Operator):
         row.prop(cell_props, "use_recenter")
         row = col.row(align=True)
         row.prop(cell_props, "cell_scale")
+        row = col.row()
+        row.prop(cell_props, "use_parallel")
+        row.prop(cell_props, "clip_mode")
         # could be own section, control how we subdiv
         #row.prop(cell_props, "use_island_split")
 
@@ -133,6 +138,8 @@ class FRACTURE_OT_Cell(Operator):
         row = col.row(align=True)
         row.prop(cell_props, "original_hide")
         row.prop(cell_props, "cell_relocate")
+        row = col.row(align=True)
+        row.prop(cell_props, "use_single_mesh")
 
         box = layout.box()
         col = box.column()
@@ -153,6 +160,30 @@ class FRACTURE_OT_Cell(Operator):
         row = col.row(align=True)
         row.prop(cell_props, "use_debug_redraw")
 
+class FRACTURE_OT_CellSplit(Operator):
+    bl_idname = "object.split_fracture_cell"
+    bl_label = "Split Cells"
+    bl_description = "Split fractured cells made as a single mesh into one object per cell"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj and obj.type == "MESH" and "cell_index" in obj.data.attributes
+
+    def execute(self, context):
+        cells = []
+        for obj in context.selected_editable_objects:
+            if obj.type == "MESH" and "cell_index" in obj.data.attributes:
+                cells += cell_functions.cells_split(context, obj)
+
+        for cell in cells:
+            cell.select_set(True)
+        if cells:
+            context.view_layer.objects.active = cells[0]
+
+        return {'FINISHED'}
+
 class FRACTURE_OT_Crack(Operator):
     bl_idname = "object.add_fracture_crack"
     bl_label = "Crack It"
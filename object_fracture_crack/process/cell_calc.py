@@ -19,6 +19,50 @@
 # Script copyright (C) Blender Foundation 2012
 
 
+def bounds_planes(original_xyz_minmax, margin_bounds=0.05):
+    xmin, xmax = original_xyz_minmax["x"]
+    ymin, ymax = original_xyz_minmax["y"]
+    zmin, zmax = original_xyz_minmax["z"]
+
+    xmin -= margin_bounds
+    xmax += margin_bounds
+    ymin -= margin_bounds
+    ymax += margin_bounds
+    zmin -= margin_bounds
+    zmax += margin_bounds
+
+    # (x,y,z,scaler) for plane. xyz is normaliized direction. scaler is scale for plane.
+    # Plane will be made at the perpendicular direction of the normal vector.
+    return [
+        (+1.0, 0.0, 0.0, -xmax),
+        (-1.0, 0.0, 0.0, +xmin),
+        (0.0, +1.0, 0.0, -ymax),
+        (0.0, -1.0, 0.0, +ymin),
+        (0.0, 0.0, +1.0, -zmax),
+        (0.0, 0.0, -1.0, +zmin),
+        ]
+
+
+def points_nearest(kdtree, co, index, total, count=16):
+    """
+    Yields the coordinates of the points closest to ``co`` first,
+    leaving out the point at ``index`` itself.
+
+    Only the points needed are looked up: the tree is searched again
+    for twice as many points once all the points found are used.
+    """
+    found = {index}
+    while True:
+        count = min(count, total)
+        for co_find, index_find, dist in kdtree.find_n(co, count):
+            if index_find not in found:
+                found.add(index_find)
+                yield co_find
+        if count == total:
+            return
+        count *= 2
+
+
 def points_to_verts(original_xyz_minmax,
                     points,
                     points_scale=None,
@@ -28,6 +72,7 @@ def points_to_verts(original_xyz_minmax,
     from math import sqrt
     import mathutils
     from mathutils import Vector
+    from mathutils.kdtree import KDTree
 
     cells = []
     plane_indices = []
@@ -40,31 +85,25 @@ def points_to_verts(original_xyz_minmax,
 
     # there are many ways we could get planes - convex hull for eg
     # but it ends up fastest if we just use bounding box
-    if 1:
-        xmin, xmax = original_xyz_minmax["x"]
-        ymin, ymax = original_xyz_minmax["y"]
-        zmin, zmax = original_xyz_minmax["z"]
-
-        xmin -= margin_bounds
-        xmax += margin_bounds
-        ymin -= margin_bounds
-        ymax += margin_bounds
-        zmin -= margin_bounds
-        zmax += margin_bounds
-
-        # (x,y,z,scaler) for plane. xyz is normaliized direction. scaler is scale for plane.
-        # Plane will be made at the perpendicular direction of the normal vector.
-        convexPlanes = [
-            Vector((+1.0, 0.0, 0.0, -xmax)),
-            Vector((-1.0, 0.0, 0.0, +xmin)),
-            Vector((0.0, +1.0, 0.0, -ymax)),
-            Vector((0.0, -1.0, 0.0, +ymin)),
-            Vector((0.0, 0.0, +1.0, -zmax)),
-            Vector((0.0, 0.0, -1.0, +zmin)),
-            ]
+    convexPlanes = [Vector(plane) for plane in bounds_planes(original_xyz_minmax, margin_bounds)]
 
     if len(points) > 1:
-        points_dist_sorted = [(Vector(p[0]), p[1]) for p in points]
+        kdtree = KDTree(len(points))
+        for i, p in enumerate(points):
+            kdtree.insert(p[0], i)
+        kdtree.balance()
+
+        # Scaling shortens the distance to a plane by the cosine between the normal and the scaled normal,
+        # this is the smallest the cosine can be, so points further than "distance_max / scale_cos_min"
+        # can't cut the cell.
+        if points_scale is None:
+            scale_cos_min = 1.0
+        elif min(points_scale) > 0.0:
+            scale_min = min(points_scale)
+            scale_max = max(points_scale)
+            scale_cos_min = 2.0 * sqrt(scale_min * scale_max) / (scale_min + scale_max)
+        else:
+            scale_cos_min = 0.0
 
         for i, point_current in enumerate(points):
             planes = [None] * len(convexPlanes)
@@ -76,21 +115,17 @@ def points_to_verts(original_xyz_minmax,
 
             distance_max = 10000000000.0  # a big value!
 
-            points_dist_sorted_current = points_dist_sorted.copy()
-            # Closer points to the current point are earlier order. Of course, current point is the first.
-            points_dist_sorted_current.sort(key=lambda p: (p[0] - point_current[0]).length_squared)
-
-            # The point itself is removed.
-            points_dist_sorted_current.pop(0)
-
             # Compare the current point with other points.
-            for j in range(len(points_dist_sorted_current)):
+            # Closer points to the current point are earlier order, the point itself is left out.
+            for point_target in points_nearest(kdtree, point_current[0], i, len(points)):
 
-                point_target = points_dist_sorted_current[j]
-                normal = 0
-                normal = point_target[0] - point_current[0]
+                normal = point_target - point_current[0]
                 nlength = normal.length # is sqrt(X^2+y^2+z^2).
 
+                # Points are sorted by (unscaled) distance, none of the following can cut the cell either.
+                if nlength * scale_cos_min > distance_max:
+                    break
+
                 if points_scale is not None:
                     normal_alt = normal.copy()
                     normal_alt.x *= points_scale[0]
@@ -106,7 +141,7 @@ def points_to_verts(original_xyz_minmax,
                     normal = normal_alt
 
                 if nlength > distance_max:
-                    break
+                    continue
 
                 # 4D vector, the same form as convexPlanes. (x,y,z,scaler).
                 plane = normal.normalized()
@@ -122,15 +157,17 @@ def points_to_verts(original_xyz_minmax,
                 if len(plane_indices) != len(planes):
                     planes[:] = [planes[k] for k in plane_indices]
 
+                # The vertices are relative to the current point, a plane half way to a point
+                # further than twice the furthest vertex (plus the margin) is outside the cell.
                 # for comparisons use length_squared and delay
                 # converting to a real length until the end.
-                distance_max = 10000000000.0  # a big value!
+                distance_max = 0.0
                 for v in vertices:
                     distance = v.length_squared
                     if distance_max < distance:
                         distance_max = distance
-                distance_max = sqrt(distance_max)  # make real length　ここでルートでマックスを下げているのか？でも下で２倍にしているが。
-                distance_max *= 2.0
+                distance_max = sqrt(distance_max)  # make real length
+                distance_max = (distance_max + margin_cell) * 2.0
 
             if len(vertices) == 0:
                 continue
@@ -145,3 +182,198 @@ def points_to_verts(original_xyz_minmax,
         cells.append((convex_center, vertices[:]))
 
     return cells
+
+
+# -----------------------------------------------------------------------------
+# Parallel cells
+#
+# Blender's Python executable can't import mathutils,
+# cells are computed from NumPy arrays in the separate processes.
+
+_plane_triples_cache = {}
+
+
+def plane_triples(count):
+    triples = _plane_triples_cache.get(count)
+    if triples is None:
+        import numpy as np
+        from itertools import combinations
+        triples = np.array(list(combinations(range(count), 3)), dtype=np.intp).reshape(-1, 3)
+        _plane_triples_cache[count] = triples
+    return triples
+
+
+def planes_to_verts(planes, radius=None, eps_isect=0.000001):
+    """
+    NumPy version of ``mathutils.geometry.points_in_planes``,
+    returns the points inside all the planes and the indices of the planes used.
+
+    Points further than ``radius`` from the origin are known to be outside of a plane.
+    """
+    import numpy as np
+
+    normals = planes[:, :3]
+    distances = planes[:, 3]
+    # Cross products of all the pairs of plane normals.
+    cross = np.cross(normals[:, None], normals[None, :])
+
+    i, j, k = plane_triples(len(planes)).T
+    det = (normals[i] * cross[j, k]).sum(axis=1)
+    valid = np.abs(det) > 0.000001
+    i, j, k, det = i[valid], j[valid], k[valid], det[valid]
+    vertices = -(distances[i, None] * cross[j, k] +
+                 distances[j, None] * cross[k, i] +
+                 distances[k, None] * cross[i, j]) / det[:, None]
+    if radius is not None:
+        # A quick test first, most points are far outside.
+        near = (vertices ** 2).sum(axis=1) <= (radius + eps_isect) ** 2
+        i, j, k, vertices = i[near], j[near], k[near], vertices[near]
+    inside = (vertices @ normals.T + distances).max(axis=1) <= eps_isect
+    triples = np.stack((i[inside], j[inside], k[inside]))
+    return vertices[inside], np.unique(triples)
+
+
+def points_to_verts_array(points, indices, planes_bounds, points_scale=None, margin_cell=0.0, count=12):
+    """
+    Same as ``points_to_verts`` without ``mathutils``, for the ``points`` at ``indices``.
+    Returns the (index, vertices) of the cells which aren't empty.
+    """
+    import numpy as np
+
+    cells = []
+    total = len(points)
+
+    if points_scale is None:
+        scale_cos_min = 1.0
+    else:
+        points_scale = np.asarray(points_scale)
+        if points_scale.min() > 0.0:
+            scale_cos_min = 2.0 * np.sqrt(points_scale.min() * points_scale.max()) / (points_scale.min() + points_scale.max())
+        else:
+            scale_cos_min = 0.0
+
+    for i in indices:
+        point = points[i]
+        planes = planes_bounds.copy()
+        planes[:, 3] += planes[:, :3] @ point
+        vertices = radius = None
+        distance_max = np.inf
+
+        # The points used are set to infinity, the point itself first.
+        dist_sq = ((points - point) ** 2).sum(axis=1)
+        dist_sq[i] = np.inf
+        remaining = total - 1
+
+        # Add the planes of the closest points a batch at a time,
+        # until the following points can't cut the cell.
+        while remaining > 0:
+            nearest = np.argpartition(dist_sq, min(count, remaining) - 1)[:min(count, remaining)]
+            nearest = nearest[np.argsort(dist_sq[nearest])]
+            nlength = np.sqrt(dist_sq[nearest])
+            dist_sq[nearest] = np.inf
+            remaining -= len(nearest)
+
+            cut = nlength * scale_cos_min <= distance_max
+            finished = not cut.all()
+            cut &= nlength > 0.0
+            normal = points[nearest[cut]] - point
+            nlength = nlength[cut]
+
+            if points_scale is not None:
+                normal_alt = normal * points_scale
+                scalar = (normal_alt * normal).sum(axis=1) / (np.linalg.norm(normal_alt, axis=1) * nlength)
+                nlength = nlength * scalar
+                normal = normal_alt
+
+            cut = nlength <= distance_max
+            if cut.any():
+                normal = normal[cut]
+                nlength = nlength[cut]
+                planes_new = np.empty((len(normal), 4))
+                planes_new[:, :3] = normal / np.linalg.norm(normal, axis=1)[:, None]
+                planes_new[:, 3] = (-nlength / 2.0) + margin_cell
+                planes = np.concatenate((planes, planes_new))
+
+                # The cell only gets smaller, its new vertices are as close as the furthest vertex.
+                vertices, plane_indices = planes_to_verts(planes, radius)
+                planes = planes[plane_indices]
+
+                radius = 0.0
+                if len(vertices):
+                    radius = np.sqrt((vertices ** 2).sum(axis=1).max())
+                distance_max = (radius + margin_cell) * 2.0
+
+            if finished:
+                break
+
+        if vertices is not None and len(vertices):
+            cells.append((i, vertices))
+
+    return cells
+
+
+def points_to_verts_parallel(original_xyz_minmax,
+                             points,
+                             points_scale=None,
+                             margin_bounds=0.05,
+                             margin_cell=0.0,
+                             jobs=0):
+    """
+    Same as ``points_to_verts``, the points are split across ``jobs`` processes
+    (one per CPU core by default) and the cells merged back in order.
+    """
+    import os
+    import sys
+    import pickle
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+    import numpy as np
+    from mathutils import Vector
+
+    if len(points) < 2:
+        return points_to_verts(original_xyz_minmax, points, points_scale, margin_bounds, margin_cell)
+
+    if points_scale is not None:
+        points_scale = tuple(points_scale)
+    if points_scale == (1.0, 1.0, 1.0):
+        points_scale = None
+
+    jobs = min(jobs or os.cpu_count() or 1, len(points))
+    points_co = np.array([tuple(p[0]) for p in points], dtype=np.float64)
+    planes_bounds = np.array(bounds_planes(original_xyz_minmax, margin_bounds), dtype=np.float64)
+
+    def cells_process(indices):
+        data = pickle.dumps((points_co, indices, planes_bounds, points_scale, margin_cell))
+        result = subprocess.run([sys.executable, __file__], input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            print(result.stderr.decode("utf-8", errors="replace"))
+            return None
+        return pickle.loads(result.stdout)
+
+    # Interleave the points, so each process gets cells from all over the object.
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(cells_process, [np.arange(job, len(points), jobs) for job in range(jobs)]))
+
+    if None in results:
+        print("Computing the cells in separate processes failed, computing them here")
+        return points_to_verts(original_xyz_minmax, points, points_scale, margin_bounds, margin_cell)
+
+    cells_index = sorted((cell for cells_job in results for cell in cells_job), key=lambda cell: cell[0])
+    return [(points[i][0], [Vector(co) for co in vertices]) for i, vertices in cells_index]
+
+
+def main():
+    """
+    Computes cells in a separate process, the pickled arguments of ``points_to_verts_array``
+    are read from the standard input and the cells written to the standard output.
+    """
+    import sys
+    import pickle
+
+    args = pickle.load(sys.stdin.buffer)
+    cells = points_to_verts_array(*args)
+    pickle.dump(cells, sys.stdout.buffer, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    main()
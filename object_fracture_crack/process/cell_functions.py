@@ -65,10 +65,11 @@ def points_from_object(original, original_xyz_minmax,
 
     def points_from_verts(original):
         """Takes points from _any_ object with geometry"""
+        from mathutils import Vector
         if original.type == 'MESH':
             mesh = original.data
             matrix = original.matrix_world.copy()
-            p = [(matrix @ v.co, 'VERTS') for v in mesh.vertices]
+            p = [(Vector(co), 'VERTS') for co in _mesh_verts(mesh, matrix).tolist()]
             return p
         else:
             depsgraph = bpy.context.evaluated_depsgraph_get()
@@ -80,17 +81,21 @@ def points_from_object(original, original_xyz_minmax,
 
             if mesh is not None:
                 matrix = original.matrix_world.copy()
-                p =  [(matrix @ v.co, 'VERTS') for v in mesh.vertices]
+                p = [(Vector(co), 'VERTS') for co in _mesh_verts(mesh, matrix).tolist()]
                 ob_eval.to_mesh_clear()
                 return p
 
     def points_from_particles(original):
+        import numpy as np
+        from mathutils import Vector
         depsgraph = bpy.context.evaluated_depsgraph_get()
         obj_eval = original.evaluated_get(depsgraph)
 
-        p = [(particle.location.copy(), 'PARTICLE')
-               for psys in obj_eval.particle_systems
-               for particle in psys.particles]
+        p = []
+        for psys in obj_eval.particle_systems:
+            co = np.empty(len(psys.particles) * 3)
+            psys.particles.foreach_get("location", co)
+            p.extend((Vector(c), 'PARTICLE') for c in co.reshape(-1, 3).tolist())
         return p
 
     def points_from_random(original, original_xyz_minmax):
@@ -140,7 +145,11 @@ def points_from_object(original, original_xyz_minmax,
 
     # grease pencil
     def get_points(stroke):
-        return [point.co.copy() for point in stroke.points]
+        import numpy as np
+        from mathutils import Vector
+        co = np.empty(len(stroke.points) * 3)
+        stroke.points.foreach_get("co", co)
+        return [Vector(c) for c in co.reshape(-1, 3).tolist()]
 
     def get_splines(gp):
         gpl = gp.layers.active
@@ -170,11 +179,17 @@ def points_from_object(original, original_xyz_minmax,
                     points.extend(line_points)
 
                 else:
+                    # Closest points are looked up in the points found so far, the tree is built once.
+                    from mathutils.kdtree import KDTree
+                    kdtree = KDTree(len(points))
+                    for i, p in enumerate(points):
+                        kdtree.insert(p[0], i)
+                    kdtree.balance()
+
                     for lp in line_points:
                         # Make vector between the line point and its closest point.
-                        points.sort(key=lambda p: (p[0] - lp[0]).length_squared)
-                        closest_point = points[0]
-                        normal = lp[0].xyz - closest_point[0].xyz
+                        closest_co, closest_index, closest_dist = kdtree.find(lp[0])
+                        normal = lp[0].xyz - closest_co
 
                         new_point = (lp[0], lp[1])
                         new_point[0].xyz +=  normal / 2
@@ -194,96 +209,30 @@ def points_to_cells(context, original, original_xyz_minmax, points,
                     material_index=0,
                     use_debug_redraw=False,
                     cell_scale=(1.0, 1.0, 1.0),
+                    use_parallel=False,
                     clean=True):
 
-    from . import cell_calc
     collection = context.collection
     view_layer = context.view_layer
 
-    # apply optional clamp
-    if source_limit != 0 and source_limit < len(points):
-        points = _limit_source(points, source_limit)
-
-    # saddly we cant be sure there are no doubles
-    from mathutils import Vector
-    to_tuple = Vector.to_tuple
-
-    # To remove doubles, round the values.
-    points = [(Vector(to_tuple(p[0], 4)),p[1]) for p in points]
-    del to_tuple
-    del Vector
+    cells_verts = _cells_verts(context, original, original_xyz_minmax, points,
+                               source_limit=source_limit,
+                               source_noise=source_noise,
+                               use_debug_points=use_debug_points,
+                               margin=margin,
+                               cell_scale=cell_scale,
+                               use_parallel=use_parallel)
 
-    if source_noise > 0.0:
-        from random import random
-        # boundbox approx of overall scale
-        from mathutils import Vector
-        matrix = original.matrix_world.copy()
-        bb_world = [matrix @ Vector(v) for v in original.bound_box]
-        scalar = source_noise * ((bb_world[0] - bb_world[6]).length / 2.0)
-
-        from mathutils.noise import random_unit_vector
-        points[:] = [(p[0] + (random_unit_vector() * (scalar * random())), p[1]) for p in points]
-
-    if use_debug_points:
-        bm = bmesh.new()
-        for p in points:
-            bm.verts.new(p[0])
-        mesh_tmp = bpy.data.meshes.new(name="DebugPoints")
-        bm.to_mesh(mesh_tmp)
-        bm.free()
-        obj_tmp = bpy.data.objects.new(name=mesh_tmp.name, object_data=mesh_tmp)
-        collection.objects.link(obj_tmp)
-        del obj_tmp, mesh_tmp
-
-    cells_verts = cell_calc.points_to_verts(original_xyz_minmax,
-                                            points,
-                                            cell_scale,
-                                            margin_cell=margin)
     # some hacks here :S
     cell_name = original.name + "_cell"
     cells = []
     for center_point, cell_verts in cells_verts:
         # ---------------------------------------------------------------------
         # BMESH
-        # create the convex hulls
-        bm = bmesh.new()
-
-        # WORKAROUND FOR CONVEX HULL BUG/LIMIT
-        # XXX small noise
-        import random
-        def R():
-            return (random.random() - 0.5) * 0.001
-
-        for i, co in enumerate(cell_verts):
-            co.x += R()
-            co.y += R()
-            co.z += R()
-            bm_vert = bm.verts.new(co)
-
-        import mathutils
-        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.005)
-        try:
-            # Making cell meshes as convex full here!
-            bmesh.ops.convex_hull(bm, input=bm.verts)
-        except RuntimeError:
-            import traceback
-            traceback.print_exc()
-
-        if clean:
-            bm.normal_update()
-            try:
-                bmesh.ops.dissolve_limit(bm, verts=bm.verts, angle_limit=0.001)
-            except RuntimeError:
-                import traceback
-                traceback.print_exc()
-        # smooth faces will remain only inner faces, after appling boolean modifier.
-        if use_smooth_faces:
-            for bm_face in bm.faces:
-                bm_face.smooth = True
-
-        if material_index != 0:
-            for bm_face in bm.faces:
-                bm_face.material_index = material_index
+        bm = _cell_bmesh(cell_verts,
+                         use_smooth_faces=use_smooth_faces,
+                         material_index=material_index,
+                         clean=clean)
 
         # ---------------------------------------------------------------------
         # MESH
@@ -339,6 +288,333 @@ def points_to_cells(context, original, original_xyz_minmax, points,
     return cells
 
 
+def _cells_verts(context, original, original_xyz_minmax, points,
+                 source_limit=0,
+                 source_noise=0.0,
+                 use_debug_points=False,
+                 margin=0.0,
+                 cell_scale=(1.0, 1.0, 1.0),
+                 use_parallel=False):
+    """Returns the (center_point, cell_verts) of the Voronoi cells of the points."""
+    from . import cell_calc
+    collection = context.collection
+
+    # apply optional clamp
+    if source_limit != 0 and source_limit < len(points):
+        points = _limit_source(points, source_limit)
+
+    # saddly we cant be sure there are no doubles
+    from mathutils import Vector
+    to_tuple = Vector.to_tuple
+
+    # To remove doubles, round the values.
+    points = [(Vector(to_tuple(p[0], 4)),p[1]) for p in points]
+    del to_tuple
+    del Vector
+
+    if source_noise > 0.0:
+        from random import random
+        # boundbox approx of overall scale
+        from mathutils import Vector
+        matrix = original.matrix_world.copy()
+        bb_world = [matrix @ Vector(v) for v in original.bound_box]
+        scalar = source_noise * ((bb_world[0] - bb_world[6]).length / 2.0)
+
+        from mathutils.noise import random_unit_vector
+        points[:] = [(p[0] + (random_unit_vector() * (scalar * random())), p[1]) for p in points]
+
+    if use_debug_points:
+        bm = bmesh.new()
+        for p in points:
+            bm.verts.new(p[0])
+        mesh_tmp = bpy.data.meshes.new(name="DebugPoints")
+        bm.to_mesh(mesh_tmp)
+        bm.free()
+        obj_tmp = bpy.data.objects.new(name=mesh_tmp.name, object_data=mesh_tmp)
+        collection.objects.link(obj_tmp)
+        del obj_tmp, mesh_tmp
+
+    if use_parallel:
+        cells_verts = cell_calc.points_to_verts_parallel(original_xyz_minmax,
+                                                         points,
+                                                         cell_scale,
+                                                         margin_cell=margin)
+    else:
+        cells_verts = cell_calc.points_to_verts(original_xyz_minmax,
+                                                points,
+                                                cell_scale,
+                                                margin_cell=margin)
+    return cells_verts
+
+
+def _cell_bmesh(cell_verts,
+                use_smooth_faces=False,
+                material_index=0,
+                clean=True):
+    """Returns the convex hull of the cell vertices as a new bmesh."""
+    # create the convex hulls
+    bm = bmesh.new()
+
+    # WORKAROUND FOR CONVEX HULL BUG/LIMIT
+    # XXX small noise
+    import random
+    def R():
+        return (random.random() - 0.5) * 0.001
+
+    for i, co in enumerate(cell_verts):
+        co.x += R()
+        co.y += R()
+        co.z += R()
+        bm_vert = bm.verts.new(co)
+
+    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.005)
+    try:
+        # Making cell meshes as convex full here!
+        bmesh.ops.convex_hull(bm, input=bm.verts)
+    except RuntimeError:
+        import traceback
+        traceback.print_exc()
+
+    if clean:
+        bm.normal_update()
+        try:
+            bmesh.ops.dissolve_limit(bm, verts=bm.verts, angle_limit=0.001)
+        except RuntimeError:
+            import traceback
+            traceback.print_exc()
+    # smooth faces will remain only inner faces, after appling boolean modifier.
+    if use_smooth_faces:
+        for bm_face in bm.faces:
+            bm_face.smooth = True
+
+    if material_index != 0:
+        for bm_face in bm.faces:
+            bm_face.material_index = material_index
+
+    return bm
+
+
+def _mesh_planes(mesh, matrix):
+    """Returns the world space (x,y,z,scaler) planes of the faces, like the planes of cell_calc."""
+    import numpy as np
+
+    normals = np.empty(len(mesh.polygons) * 3)
+    centers = np.empty(len(mesh.polygons) * 3)
+    mesh.polygons.foreach_get("normal", normals)
+    mesh.polygons.foreach_get("center", centers)
+
+    normals = normals.reshape(-1, 3) @ np.array(matrix.inverted_safe().transposed().to_3x3()).T
+    centers = centers.reshape(-1, 3) @ np.array(matrix.to_3x3()).T + np.array(matrix.translation)
+    length = np.linalg.norm(normals, axis=1)
+    length[length == 0.0] = 1.0
+    normals /= length[:, None]
+
+    planes = np.empty((len(normals), 4))
+    planes[:, :3] = normals
+    planes[:, 3] = -(normals * centers).sum(axis=1)
+    return planes
+
+
+def _mesh_verts(mesh, matrix):
+    import numpy as np
+
+    co = np.empty(len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3) @ np.array(matrix.to_3x3()).T + np.array(matrix.translation)
+
+
+def original_planes(original, use_hull=False):
+    """
+    Returns the planes of the faces of the original with their face indices, when it's convex,
+    else None. With use_hull the planes of its convex hull are used (face indices are None).
+    """
+    import numpy as np
+
+    mesh = original.data
+    matrix = original.matrix_world
+    co = _mesh_verts(mesh, matrix)
+    if len(co) < 4:
+        return None
+    eps = 0.0001 * np.linalg.norm(co.max(axis=0) - co.min(axis=0))
+
+    if use_hull:
+        bm = bmesh.new()
+        for v in co:
+            bm.verts.new(v)
+        try:
+            bmesh.ops.convex_hull(bm, input=bm.verts)
+        except RuntimeError:
+            import traceback
+            traceback.print_exc()
+            bm.free()
+            return None
+        for bm_vert in [bm_vert for bm_vert in bm.verts if not bm_vert.link_faces]:
+            bm.verts.remove(bm_vert)
+        bm.normal_update()
+        planes = np.array([(*f.normal, -f.normal.dot(f.verts[0].co)) for f in bm.faces if f.normal.length > 0.0])
+        faces = None
+        bm.free()
+        if not len(planes):
+            return None
+        # normals pointing out.
+        flip = (planes[:, :3] @ co.mean(axis=0) + planes[:, 3]) > 0.0
+        planes[flip] *= -1.0
+    else:
+        # only closed meshes, every edge between two faces.
+        edge_indices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("edge_index", edge_indices)
+        if len(mesh.edges) == 0 or (np.bincount(edge_indices, minlength=len(mesh.edges)) != 2).any():
+            return None
+
+        planes = _mesh_planes(mesh, matrix)
+
+        # coplanar faces share a plane.
+        planes_key = np.round(planes / eps).astype(np.int64)
+        planes_key[:, :3] = np.round(planes[:, :3] * 10000.0)
+        faces = np.unique(planes_key, axis=0, return_index=True)[1]
+        faces.sort()
+        planes = planes[faces]
+
+        # convex when no vertex is outside of a face.
+        for i in range(0, len(planes), 64):
+            if (co @ planes[i:i + 64, :3].T + planes[i:i + 64, 3]).max() > eps:
+                return None
+
+    return planes, faces, eps
+
+
+def _cell_clip_bmesh(co, planes_cell, matrix, clip_planes, polygons_original,
+                     material_index=0,
+                     use_smooth=False,
+                     clean=True,
+                     use_interior_hide=False,
+                     remove_doubles=True,
+                     ):
+    """
+    Clip a cell given by its world space vertices with the convex original, planes_cell returns
+    the world space planes of the cell (only called when the cell crosses the original).
+    Returns the clipped cell as a new bmesh in the space of matrix,
+    None when the cell is inside the original and False when it's outside.
+    """
+    import numpy as np
+    import mathutils
+    from mathutils import Vector
+
+    planes_original, faces_original, eps = clip_planes
+
+    # A plane with the whole cell outside removes it,
+    # planes with the whole cell inside don't matter (the cell is kept as it is).
+    distance = co @ planes_original[:, :3].T + planes_original[:, 3]
+    if not len(co) or (distance.min(axis=0) > eps).any():
+        return False
+
+    crossing = np.flatnonzero(distance.max(axis=0) > eps)
+    if not len(crossing):
+        return None
+
+    planes_cross = planes_original[crossing]
+    planes = [Vector(plane) for plane in np.concatenate((planes_cell(), planes_cross))]
+    vertices, _ = mathutils.geometry.points_in_planes(planes)
+    if not vertices:
+        return False
+
+    matrix_inverse = matrix.inverted_safe()
+    bm = bmesh.new()
+    for co_world in vertices:
+        bm.verts.new(matrix_inverse @ co_world)
+    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.00001)
+    try:
+        bmesh.ops.convex_hull(bm, input=bm.verts)
+    except RuntimeError:
+        import traceback
+        traceback.print_exc()
+    bmesh.ops.delete(bm, geom=[bm_vert for bm_vert in bm.verts if not bm_vert.link_faces], context='VERTS')
+
+    if clean:
+        bm.normal_update()
+        try:
+            bmesh.ops.dissolve_limit(bm, verts=bm.verts, edges=bm.edges, angle_limit=0.001)
+        except RuntimeError:
+            import traceback
+            traceback.print_exc()
+
+    if remove_doubles:
+        bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.005)
+
+    # faces on the planes of the original are its surface, the others are interior.
+    bm.normal_update()
+    for bm_face in bm.faces:
+        normal = (matrix_inverse.transposed().to_3x3() @ bm_face.normal).normalized()
+        center = matrix @ bm_face.calc_center_median()
+        distance = planes_cross[:, :3] @ tuple(center) + planes_cross[:, 3]
+        match = np.flatnonzero((np.abs(distance) <= eps) & (planes_cross[:, :3] @ tuple(normal) > 0.999))
+        if len(match) and faces_original is not None:
+            polygon = polygons_original[faces_original[crossing[match[0]]]]
+            bm_face.material_index = polygon.material_index
+            bm_face.smooth = polygon.use_smooth
+            bm_face.hide = polygon.hide
+        elif len(match):
+            bm_face.material_index = 0
+            bm_face.smooth = False
+            bm_face.hide = False
+        else:
+            bm_face.material_index = material_index
+            bm_face.smooth = use_smooth
+            bm_face.hide = use_interior_hide
+
+    return bm
+
+
+def cell_clip(context, original, cells, clip_planes,
+              clean=True,
+              use_interior_hide=False,
+              use_debug_redraw=False,
+              remove_doubles=True,
+              ):
+    """
+    Intersect the cells with the convex original (clip_planes from original_planes),
+    without the boolean modifier: the planes of the cell and the planes of the original
+    crossing it make the vertices of the clipped cell.
+    """
+    cells_clip = []
+    polygons_original = original.data.polygons
+
+    for cell in cells:
+        mesh = cell.data
+        matrix = cell.matrix_world
+
+        bm = _cell_clip_bmesh(_mesh_verts(mesh, matrix),
+                              lambda: _mesh_planes(mesh, matrix),
+                              matrix, clip_planes, polygons_original,
+                              material_index=mesh.polygons[0].material_index if mesh.polygons else 0,
+                              use_smooth=mesh.polygons[0].use_smooth if mesh.polygons else False,
+                              clean=clean,
+                              use_interior_hide=use_interior_hide,
+                              remove_doubles=remove_doubles,
+                              )
+
+        if bm is False:
+            bpy.data.objects.remove(cell, do_unlink=True)
+            if not mesh.users:
+                bpy.data.meshes.remove(mesh)
+            continue
+
+        if bm is not None:
+            bm.to_mesh(mesh)
+            bm.free()
+        elif use_interior_hide:
+            mesh.polygons.foreach_set("hide", [True] * len(mesh.polygons))
+
+        cells_clip.append(cell)
+
+        if use_debug_redraw:
+            _redraw_yasiamevil()
+
+    bpy.context.view_layer.objects.active = original
+    context.view_layer.update()
+    return cells_clip
+
+
 def cell_boolean(context, original, cells,
                 use_debug_bool=False,
                 clean=True,
@@ -346,7 +622,8 @@ def cell_boolean(context, original, cells,
                 use_interior_hide=False,
                 use_debug_redraw=False,
                 level=0,
-                remove_doubles=True
+                remove_doubles=True,
+                clip_mode='BOOLEAN',
                 ):
 
     cells_boolean = []
@@ -358,6 +635,18 @@ def cell_boolean(context, original, cells,
         # only set for level 0
         original.data.polygons.foreach_set("hide", [False] * len(original.data.polygons))
 
+    # Convex originals are clipped by their planes, there is no boolean needed.
+    if clip_mode != 'BOOLEAN' and not use_debug_bool:
+        clip_planes = original_planes(original, use_hull=(clip_mode == 'HULL'))
+        if clip_planes is not None:
+            return cell_clip(context, original, cells, clip_planes,
+                             clean=clean,
+                             use_interior_hide=use_interior_hide,
+                             use_debug_redraw=use_debug_redraw,
+                             remove_doubles=remove_doubles,
+                             )
+        print("%s isn't convex, using the boolean modifier" % original.name)
+
     # The first object can't be applied by bool, so it is used as a no-effect first straw-man.
     bpy.ops.mesh.primitive_cube_add(enter_editmode=False, location=(original.location.x+10000000000.0, 0, 0))
     temp_cell = bpy.context.active_object
@@ -465,6 +754,257 @@ def cell_boolean(context, original, cells,
     return cells_boolean
 
 
+def _cells_mesh_new(name, co, loops, loop_start, material_index, use_smooth, hide, cell_index, uvs={}):
+    """New mesh from flat arrays of all cells, the cell of each face goes to the "cell_index" face attribute."""
+    import numpy as np
+
+    mesh_dst = bpy.data.meshes.new(name=name)
+    mesh_dst.vertices.add(len(co))
+    mesh_dst.loops.add(len(loops))
+    mesh_dst.polygons.add(len(loop_start))
+    mesh_dst.vertices.foreach_set("co", np.asarray(co, dtype=np.float32).ravel())
+    mesh_dst.loops.foreach_set("vertex_index", np.asarray(loops, dtype=np.int32))
+    mesh_dst.polygons.foreach_set("loop_start", np.asarray(loop_start, dtype=np.int32))
+    mesh_dst.polygons.foreach_set("material_index", np.asarray(material_index, dtype=np.int32))
+    mesh_dst.polygons.foreach_set("use_smooth", np.asarray(use_smooth, dtype=bool))
+    mesh_dst.polygons.foreach_set("hide", np.asarray(hide, dtype=bool))
+    mesh_dst.update(calc_edges=True)
+
+    for key, uv in uvs.items():
+        mesh_dst.uv_layers.new(name=key).data.foreach_set("uv", uv)
+
+    mesh_dst.attributes.new(name="cell_index", type='INT', domain='FACE').data.foreach_set(
+        "value", np.asarray(cell_index, dtype=np.int32))
+    return mesh_dst
+
+
+def cells_mesh(context, original, original_xyz_minmax, points, clip_planes, name,
+               source_limit=0,
+               source_noise=0.0,
+               use_smooth_faces=False,
+               use_data_match=False,
+               use_debug_points=False,
+               margin=0.0,
+               material_index=0,
+               use_debug_redraw=False,
+               cell_scale=(1.0, 1.0, 1.0),
+               use_parallel=False,
+               use_interior_hide=False,
+               clean=True,
+               remove_doubles=True):
+    """
+    Build the cells of a convex original (clip_planes from original_planes) straight into one mesh,
+    like points_to_cells and cell_clip without an object or mesh per cell.
+    The index of the cell of each face is kept in the "cell_index" face attribute.
+    """
+    import numpy as np
+    from mathutils import Matrix
+
+    cells_verts = _cells_verts(context, original, original_xyz_minmax, points,
+                               source_limit=source_limit,
+                               source_noise=source_noise,
+                               use_debug_points=use_debug_points,
+                               margin=margin,
+                               cell_scale=cell_scale,
+                               use_parallel=use_parallel)
+
+    if use_interior_hide:
+        original.data.polygons.foreach_set("hide", [False] * len(original.data.polygons))
+
+    matrix = Matrix.Identity(4)
+    polygons_original = original.data.polygons
+    co = []
+    loops = []
+    loop_start = []
+    face_material_index = []
+    face_smooth = []
+    face_hide = []
+    cell_index = []
+    totcell = 0
+    totvert = 0
+    totloop = 0
+
+    for center_point, cell_verts in cells_verts:
+        bm = _cell_bmesh(cell_verts,
+                         use_smooth_faces=use_smooth_faces,
+                         material_index=material_index,
+                         clean=clean)
+        bmesh.ops.translate(bm, verts=bm.verts, vec=center_point)
+        bm.normal_update()
+
+        bm_clip = _cell_clip_bmesh(np.array([v.co for v in bm.verts]).reshape(-1, 3),
+                                   lambda: np.array([(*f.normal, -f.normal.dot(f.calc_center_median()))
+                                                     for f in bm.faces]).reshape(-1, 4),
+                                   matrix, clip_planes, polygons_original,
+                                   material_index=material_index,
+                                   use_smooth=use_smooth_faces,
+                                   clean=clean,
+                                   use_interior_hide=use_interior_hide,
+                                   remove_doubles=remove_doubles,
+                                   )
+        if bm_clip is False:
+            bm.free()
+            continue
+        if bm_clip is None:
+            for bm_face in bm.faces:
+                bm_face.hide = use_interior_hide
+        else:
+            bm.free()
+            bm = bm_clip
+
+        bm.verts.index_update()
+        co.extend(v.co[:] for v in bm.verts)
+        for bm_face in bm.faces:
+            loop_start.append(totloop)
+            loops.extend(totvert + v.index for v in bm_face.verts)
+            totloop += len(bm_face.verts)
+            face_material_index.append(bm_face.material_index)
+            face_smooth.append(bm_face.smooth)
+            face_hide.append(bm_face.hide)
+        cell_index.extend([totcell] * len(bm.faces))
+        totcell += 1
+        totvert += len(bm.verts)
+        bm.free()
+
+        if use_debug_redraw:
+            _redraw_yasiamevil()
+
+    mesh_dst = _cells_mesh_new(name, np.array(co).reshape(-1, 3), loops, loop_start,
+                               face_material_index, face_smooth, face_hide, cell_index)
+    if use_data_match:
+        for mat in original.data.materials:
+            mesh_dst.materials.append(mat)
+
+    obj = bpy.data.objects.new(name=name, object_data=mesh_dst)
+    context.collection.objects.link(obj)
+
+    context.view_layer.update()
+    return obj
+
+
+def cells_join(context, cells, name):
+    """
+    Build all cells into one mesh in bulk, the cell objects and meshes are removed.
+    The index of the cell of each face is kept in the "cell_index" face attribute.
+    """
+    import numpy as np
+
+    meshes = [cell.data for cell in cells]
+    totvert = np.cumsum([0] + [len(mesh.vertices) for mesh in meshes])
+    totloop = np.cumsum([0] + [len(mesh.loops) for mesh in meshes])
+    totpoly = np.cumsum([0] + [len(mesh.polygons) for mesh in meshes])
+
+    co = np.concatenate([_mesh_verts(mesh, cell.matrix_world) for cell, mesh in zip(cells, meshes)])
+    loops = np.empty(totloop[-1], dtype=np.int32)
+    loop_start = np.empty(totpoly[-1], dtype=np.int32)
+    material_index = np.empty(totpoly[-1], dtype=np.int32)
+    use_smooth = np.empty(totpoly[-1], dtype=bool)
+    hide = np.empty(totpoly[-1], dtype=bool)
+    uv_names = list(dict.fromkeys(key for mesh in meshes for key in mesh.uv_layers.keys()))
+    uvs = {key: np.zeros(totloop[-1] * 2, dtype=np.float32) for key in uv_names}
+
+    for i, mesh in enumerate(meshes):
+        loop_slice = slice(totloop[i], totloop[i + 1])
+        poly_slice = slice(totpoly[i], totpoly[i + 1])
+        mesh.loops.foreach_get("vertex_index", loops[loop_slice])
+        loops[loop_slice] += totvert[i]
+        mesh.polygons.foreach_get("loop_start", loop_start[poly_slice])
+        loop_start[poly_slice] += totloop[i]
+        mesh.polygons.foreach_get("material_index", material_index[poly_slice])
+        mesh.polygons.foreach_get("use_smooth", use_smooth[poly_slice])
+        mesh.polygons.foreach_get("hide", hide[poly_slice])
+        for uv_layer in mesh.uv_layers:
+            uv_layer.data.foreach_get("uv", uvs[uv_layer.name][totloop[i] * 2:totloop[i + 1] * 2])
+
+    cell_index = np.repeat(np.arange(len(cells), dtype=np.int32), np.diff(totpoly))
+    mesh_dst = _cells_mesh_new(name, co, loops, loop_start, material_index, use_smooth, hide, cell_index, uvs=uvs)
+    if meshes:
+        for mat in meshes[0].materials:
+            mesh_dst.materials.append(mat)
+
+    obj = bpy.data.objects.new(name=name, object_data=mesh_dst)
+    context.collection.objects.link(obj)
+    bpy.data.batch_remove(cells + meshes)
+
+    context.view_layer.update()
+    return obj
+
+
+def cells_split(context, obj):
+    """Split a mesh made by cells_join() into one object per cell, the object and its mesh are removed."""
+    import numpy as np
+
+    mesh = obj.data
+    totloop = len(mesh.loops)
+    totpoly = len(mesh.polygons)
+
+    co = _mesh_verts(mesh, obj.matrix_world)
+    loops = np.empty(totloop, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    loop_start = np.empty(totpoly, dtype=np.int32)
+    loop_total = np.empty(totpoly, dtype=np.int32)
+    material_index = np.empty(totpoly, dtype=np.int32)
+    use_smooth = np.empty(totpoly, dtype=bool)
+    hide = np.empty(totpoly, dtype=bool)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    mesh.polygons.foreach_get("material_index", material_index)
+    mesh.polygons.foreach_get("use_smooth", use_smooth)
+    mesh.polygons.foreach_get("hide", hide)
+    cell_index = np.empty(totpoly, dtype=np.int32)
+    mesh.attributes["cell_index"].data.foreach_get("value", cell_index)
+    uvs = {}
+    for uv_layer in mesh.uv_layers:
+        uvs[uv_layer.name] = np.empty(totloop * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uvs[uv_layer.name])
+
+    # faces of each cell, in their original order.
+    order = np.argsort(cell_index, kind='stable')
+    polys_cells = np.split(order, np.flatnonzero(np.diff(cell_index[order])) + 1)
+
+    name = obj.name
+    collections = obj.users_collection
+    cells = []
+    for polys in polys_cells:
+        if not len(polys):
+            continue
+        totals = loop_total[polys]
+        loop_start_cell = np.cumsum(totals) - totals
+        loop_indices = np.repeat(loop_start[polys] - loop_start_cell, totals) + np.arange(totals.sum())
+        vert_indices, loops_cell = np.unique(loops[loop_indices], return_inverse=True)
+        co_cell = co[vert_indices]
+        center = co_cell.mean(axis=0)
+
+        mesh_dst = bpy.data.meshes.new(name=name)
+        mesh_dst.vertices.add(len(vert_indices))
+        mesh_dst.loops.add(len(loop_indices))
+        mesh_dst.polygons.add(len(polys))
+        mesh_dst.vertices.foreach_set("co", (co_cell - center).astype(np.float32).ravel())
+        mesh_dst.loops.foreach_set("vertex_index", loops_cell.astype(np.int32))
+        mesh_dst.polygons.foreach_set("loop_start", loop_start_cell.astype(np.int32))
+        mesh_dst.polygons.foreach_set("material_index", material_index[polys])
+        mesh_dst.polygons.foreach_set("use_smooth", use_smooth[polys])
+        mesh_dst.polygons.foreach_set("hide", hide[polys])
+        mesh_dst.update(calc_edges=True)
+
+        for key, uv in uvs.items():
+            uv = uv.reshape(-1, 2)[loop_indices]
+            mesh_dst.uv_layers.new(name=key).data.foreach_set("uv", uv.ravel())
+        for mat in mesh.materials:
+            mesh_dst.materials.append(mat)
+
+        cell = bpy.data.objects.new(name=name, object_data=mesh_dst)
+        for collection in collections:
+            collection.objects.link(cell)
+        cell.location = center
+        cells.append(cell)
+
+    bpy.data.batch_remove([obj, mesh])
+
+    context.view_layer.update()
+    return cells
+
+
 def interior_handle(cells,
                     use_interior_vgroup=False,
                     use_sharp_edges=False,
@@ -8,8 +8,9 @@ else:
 import bpy
 
 
-def main_object(context, original, level, **kw):
+def main_object(context, original, level, timings=None, **kw):
     import random
+    import time
 
     # pull out some args
     kw_copy = kw.copy()
@@ -28,9 +29,11 @@ def main_object(context, original, level, **kw):
     recursion_chance_select = kw_copy.pop("recursion_chance_select")
     use_island_split = kw_copy.pop("use_island_split")
     use_debug_bool = kw_copy.pop("use_debug_bool")
+    clip_mode = kw_copy.pop("clip_mode")
     use_interior_vgroup = kw_copy.pop("use_interior_vgroup")
     use_sharp_edges = kw_copy.pop("use_sharp_edges")
     use_sharp_edges_apply = kw_copy.pop("use_sharp_edges_apply")
+    use_single_mesh = kw_copy.pop("use_single_mesh")
 
     cell_relocate = kw_copy.pop("cell_relocate")
 
@@ -54,6 +57,10 @@ def main_object(context, original, level, **kw):
     original_verts = [original_matrix @ v.co for v in original_mesh.vertices]
     original_xyz_minmax = cell_functions.original_minmax(original_verts)
 
+    if timings is None:
+        timings = dict.fromkeys(("points", "cells", "boolean", "post-process"), 0.0)
+
+    t = time.time()
     cells = []
     points = cell_functions.points_from_object(original, original_xyz_minmax,
                                                source_vert_own=source_vert_own,
@@ -62,15 +69,38 @@ def main_object(context, original, level, **kw):
                                                source_particle_child=source_particle_child,
                                                source_pencil=source_pencil,
                                                source_random=source_random)
-
-    cells = cell_functions.points_to_cells(context, original, original_xyz_minmax, points, **kw_copy)
-    cells = cell_functions.cell_boolean(context, original, cells,
-                                        use_island_split=use_island_split,
-                                        use_interior_hide=(use_interior_vgroup or use_sharp_edges),
-                                        use_debug_bool=use_debug_bool,
-                                        use_debug_redraw=kw_copy["use_debug_redraw"],
-                                        level=level,
-                                        )
+    timings["points"] += time.time() - t
+
+    # Single mesh cells of a convex original are clipped by its planes and built straight into one mesh,
+    # recursion and booleans need an object per cell (joined after).
+    clip_planes = None
+    if level == 0 and use_single_mesh and recursion == 0 and clip_mode != 'BOOLEAN' and not use_debug_bool:
+        clip_planes = cell_functions.original_planes(original, use_hull=(clip_mode == 'HULL'))
+        if clip_planes is None:
+            print("%s isn't convex, building an object per cell before joining them" % original.name)
+
+    if clip_planes is not None:
+        t = time.time()
+        cells = [cell_functions.cells_mesh(context, original, original_xyz_minmax, points, clip_planes,
+                                           original.name + "_cell",
+                                           use_interior_hide=(use_interior_vgroup or use_sharp_edges),
+                                           **kw_copy)]
+        timings["cells"] += time.time() - t
+    else:
+        t = time.time()
+        cells = cell_functions.points_to_cells(context, original, original_xyz_minmax, points, **kw_copy)
+        timings["cells"] += time.time() - t
+
+        t = time.time()
+        cells = cell_functions.cell_boolean(context, original, cells,
+                                            use_island_split=use_island_split,
+                                            use_interior_hide=(use_interior_vgroup or use_sharp_edges),
+                                            use_debug_bool=use_debug_bool,
+                                            use_debug_redraw=kw_copy["use_debug_redraw"],
+                                            level=level,
+                                            clip_mode=clip_mode,
+                                            )
+        timings["boolean"] += time.time() - t
 
     # must apply after boolean.
     if use_recenter:
@@ -110,7 +140,7 @@ def main_object(context, original, level, **kw):
             for i, obj_cell in objects_recurse_input:
                 assert(cells[i] is obj_cell)
                 # Repeat main_object() here.
-                objects_recursive += main_object(context, obj_cell, level_sub, **kw)
+                objects_recursive += main_object(context, obj_cell, level_sub, timings=timings, **kw)
                 #if original_remove:
                 collection.objects.unlink(obj_cell)
                 del cells[i]
@@ -123,6 +153,10 @@ def main_object(context, original, level, **kw):
 
     #--------------
     # Level Options
+    t = time.time()
+    if level == 0 and use_single_mesh and cells and clip_planes is None:
+        cells = [cell_functions.cells_join(context, cells, original.name + "_cell")]
+
     if level == 0:
         # import pdb; pdb.set_trace()
         if use_interior_vgroup or use_sharp_edges:
@@ -139,14 +173,14 @@ def main_object(context, original, level, **kw):
     if kw_copy["use_debug_redraw"]:
         original.display_type = original_display_type_prev
 
+    timings["post-process"] += time.time() - t
     return cells
 
 
 def main(context, original, **kw):
-    '''
     import time
     t = time.time()
-    '''
+    timings = dict.fromkeys(("points", "cells", "boolean", "post-process"), 0.0)
 
     kw_copy = kw.copy()
 
@@ -170,13 +204,14 @@ def main(context, original, **kw):
         if pre_simplify > 0.0:
             cell_functions.simplify_original(original=original, pre_simplify=pre_simplify)
 
-        cells += main_object(context, original, 0, **kw_copy)
+        cells += main_object(context, original, 0, timings=timings, **kw_copy)
 
         if pre_simplify > 0.0:
             cell_functions.desimplify_original(original=original)
     else:
         assert obj.type == 'MESH', "No MESH object selected."
 
+    t_post = time.time()
     bpy.ops.object.select_all(action='DESELECT')
 
     for cell in cells:
@@ -203,6 +238,7 @@ def main(context, original, **kw):
     if original_hide:
         original.hide_set(True)
 
-    #print("Done! %d objects in %.4f sec" % (len(cells), time.time() - t))
-    #print("Done!")
+    timings["post-process"] += time.time() - t_post
+    print("Done! %d objects in %.4f sec" % (len(cells), time.time() - t))
+    print("  " + ", ".join("%s %.4f sec" % item for item in timings.items()))
     return (original, cells)
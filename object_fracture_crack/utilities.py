@@ -10,9 +10,11 @@ def _cell_props_to_dict(fracture_cell_props):
         'source_noise': fracture_cell_props.source_noise,
         'margin': fracture_cell_props.margin,
         'cell_scale': fracture_cell_props.cell_scale,
+        'use_parallel': fracture_cell_props.use_parallel,
         'pre_simplify': fracture_cell_props.pre_simplify,
         'use_recenter': fracture_cell_props.use_recenter,
         'use_island_split': fracture_cell_props.use_island_split,
+        'clip_mode': fracture_cell_props.clip_mode,
         'recursion': fracture_cell_props.recursion,
         'recursion_source_limit': fracture_cell_props.recursion_source_limit,
         'recursion_clamp': fracture_cell_props.recursion_clamp,
@@ -30,6 +32,7 @@ def _cell_props_to_dict(fracture_cell_props):
         'collection_name': fracture_cell_props.collection_name,
         'original_hide': fracture_cell_props.original_hide,
         'cell_relocate': fracture_cell_props.cell_relocate,
+        'use_single_mesh': fracture_cell_props.use_single_mesh,
         'use_mass': fracture_cell_props.use_mass,
         'mass_name': fracture_cell_props.mass_name,
         'mass_mode': fracture_cell_props.mass_mode,